@@ -85,6 +85,8 @@ class MemoryBank:
         budgets: Budget limits by category (e.g., {"transport": 5000})
         conversation_history: Last 5 conversation entries
         max_history: Maximum number of conversations to store
+        profile_version: Counter bumped when the profile or budgets change,
+            for caching their rendered context (history updates leave it alone)
     """
     
     def __init__(
@@ -108,6 +110,7 @@ class MemoryBank:
         self.budgets = budgets or {}
         self.conversation_history: List[ConversationEntry] = []
         self.max_history = max_history
+        self.profile_version = 0
         
         logger.info(f"MemoryBank initialized for user: {self.user_profile.name}")
     
@@ -216,6 +219,7 @@ class MemoryBank:
             profile: New user profile
         """
         self.user_profile = profile
+        self.profile_version += 1
         logger.info(f"User profile updated: {profile.name}")
     
     def update_budget(self, category: str, amount: float) -> None:
@@ -227,6 +231,7 @@ class MemoryBank:
             amount: Budget amount in KES
         """
         self.budgets[category.lower()] = amount
+        self.profile_version += 1
         logger.info(f"Budget updated: {category} = KES {amount:,.2f}")
     
     def get_budget(self, category: str) -> Optional[float]:
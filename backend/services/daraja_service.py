@@ -14,7 +14,10 @@ Key Features:
 
 Production Note:
 In production, replace this mock with actual Daraja API calls using
-the `requests` library and proper OAuth2 authentication.
+the `requests` library and proper OAuth2 authentication. Reuse a
+`requests.Session` per worker thread (e.g. via `threading.local`) so the
+OAuth token request and STK Push share keep-alive connections; a Session
+is not guaranteed to be thread-safe, so do not share one across threads.
 
 Reference: Agent Tools whitepaper p.18 - "Separation of Concerns"
 
@@ -23,6 +26,7 @@ License: MIT
 """
 
 import os
+import asyncio
 import logging
 import uuid
 from typing import Dict, Any, Optional
@@ -218,6 +222,36 @@ class DarajaService:
             'environment': self.environment
         }
     
+    async def trigger_stk_push_async(
+        self,
+        phone_number: str,
+        amount: float,
+        reference: str,
+        description: str = "Payment request"
+    ) -> Dict[str, Any]:
+        """
+        Async variant of trigger_stk_push for concurrent bulk requests.
+        
+        The mock runs trigger_stk_push in a worker thread so callers can
+        gather many requests at once. In production, this would await an
+        async HTTP POST (e.g. httpx.AsyncClient) to Daraja API instead.
+        
+        Args:
+            phone_number: Customer phone number (format: 254XXXXXXXXX)
+            amount: Payment amount in KES
+            reference: Payment reference (e.g., invoice number)
+            description: Payment description shown to customer
+            
+        Returns:
+            Dict with payment details (see trigger_stk_push)
+            
+        Raises:
+            ValueError: If phone number or amount is invalid
+        """
+        return await asyncio.to_thread(
+            self.trigger_stk_push, phone_number, amount, reference, description
+        )
+    
     def get_payment_status(self, checkout_request_id: str) -> Dict[str, Any]:
         """
         Query the status of an STK Push payment request.
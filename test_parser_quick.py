@@ -69,6 +69,22 @@ print(f"Amount Extraction: {amount_matches}/{total_valid} ({amount_matches/total
 print(f"Reference Extraction: {reference_matches}/{total_valid} ({reference_matches/total_valid*100:.1f}%)")
 print(f"Transaction Type: {type_matches}/{total_valid} ({type_matches/total_valid*100:.1f}%)")
 
+# Summaries and validation must work for every parsed transaction
+print(f"\n🧾 SUMMARY & VALIDATION:\n")
+summary_count = 0
+valid_count = 0
+for result in results:
+    if 'error' in result:
+        continue
+    if parser.get_transaction_summary(result):
+        summary_count += 1
+    is_valid, _ = parser.validate_parsed_data(result)
+    if is_valid:
+        valid_count += 1
+
+print(f"Summaries Generated: {summary_count}/{total_valid}")
+print(f"Passed Validation: {valid_count}/{total_valid}")
+
 # Show some examples
 print(f"\n📝 SAMPLE PARSED TRANSACTIONS:\n")
 for i in [0, 1, 2]:
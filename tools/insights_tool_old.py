@@ -17,7 +17,7 @@ License: MIT
 """
 
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
@@ -58,6 +58,10 @@ class TrendDirection(Enum):
     VOLATILE = "volatile"
 
 
+# Enum iteration walks the member map on every call; snapshot it once
+_ALL_INSIGHT_TYPES = tuple(InsightType)
+
+
 # ============================================================================
 # Data Models
 # ============================================================================
@@ -163,7 +167,7 @@ class InsightsTool:
     
     def __init__(self):
         """Initialize the insights tool."""
-        self.insight_types = [t for t in InsightType]
+        self.insight_types = _ALL_INSIGHT_TYPES
         logger.info("Insights Tool initialized (Milestone 1 - Placeholder)")
     
     def generate_insights(
@@ -426,12 +430,15 @@ def analyze_transactions(
     
     try:
         report = tool.generate_insights(transactions)
+        # Single recursive conversion; also detaches the response from the
+        # report's dataclasses (__dict__ handed out the live attribute dicts)
+        report_data = asdict(report)
         return {
             "success": True,
             "report": {
-                "period": report.period,
-                "summary": report.summary.__dict__,
-                "insights": [ins.__dict__ for ins in report.insights],
+                "period": report_data["period"],
+                "summary": report_data["summary"],
+                "insights": report_data["insights"],
                 "generated_at": report.generated_at.isoformat()
             }
         }
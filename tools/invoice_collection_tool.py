@@ -16,11 +16,14 @@ Author: Alfred Munga
 License: MIT
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Mapping
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
+from bisect import bisect_right
 import logging
+import os
+import re
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -59,6 +62,42 @@ class FollowUpAction(Enum):
     NEGOTIATE_PAYMENT_PLAN = "negotiate_payment_plan"
 
 
+# Follow-up template escalation by days overdue:
+#   < 1 day -> polite_reminder, 1-7 days -> overdue_notice, >= 8 days -> payment_plan
+_TEMPLATE_KEYS = ("polite_reminder", "overdue_notice", "payment_plan")
+_TEMPLATE_BINS = (1, 8)
+
+
+def _select_template_key(days_overdue: int) -> str:
+    """Map days overdue to a follow-up template key via threshold lookup."""
+    return _TEMPLATE_KEYS[bisect_right(_TEMPLATE_BINS, days_overdue)]
+
+
+# Splits a message template into ({field}, literal) segments
+_TEMPLATE_SEGMENT_RE = re.compile(r'\{(\w+)\}|([^{]+)')
+
+
+def _compile_template(template: str) -> Callable[[Mapping[str, str]], str]:
+    """
+    Pre-parse a message template into a render function.
+    
+    Placeholders are located once here, so rendering is a single join over
+    the pre-split segments instead of re-parsing the template per message.
+    
+    Args:
+        template: Template string with {field} placeholders
+        
+    Returns:
+        Callable rendering the template from a mapping of field values
+    """
+    segments = _TEMPLATE_SEGMENT_RE.findall(template)
+    
+    def render(fields: Mapping[str, str]) -> str:
+        return "".join(fields[name] if name else literal for name, literal in segments)
+    
+    return render
+
+
 # ============================================================================
 # Data Models
 # ============================================================================
@@ -152,23 +191,29 @@ class InvoiceCollectionTool:
     - Customer communication templates
     """
     
-    def __init__(self):
-        """Initialize the invoice collection tool."""
+    def __init__(self, mpesa_number: Optional[str] = None):
+        """
+        Initialize the invoice collection tool.
+        
+        Args:
+            mpesa_number: M-Pesa number quoted in reminders (from .env if not provided)
+        """
+        self.mpesa_number = mpesa_number or os.getenv('MPESA_SHORTCODE', '')
         self.message_templates = self._load_message_templates()
         logger.info("Invoice Collection Tool initialized (Milestone 1 - Placeholder)")
     
-    def _load_message_templates(self) -> Dict[str, str]:
+    def _load_message_templates(self) -> Dict[str, Callable[[Mapping[str, str]], str]]:
         """
         Load SMS message templates for follow-ups.
         
         Returns:
-            Dict of message templates
+            Dict of compiled message templates (see _compile_template)
         """
         # TODO Milestone 2: Load from configuration/database
         # TODO Milestone 2: Support multiple languages
         # TODO Milestone 2: Allow custom templates
         
-        return {
+        templates = {
             "polite_reminder": (
                 "Hello {customer_name}, this is a friendly reminder that invoice "
                 "{invoice_id} for KES {amount} is due on {due_date}. "
@@ -189,6 +234,18 @@ class InvoiceCollectionTool:
                 "for invoice {invoice_id}. We appreciate your business!"
             )
         }
+        
+        return {key: _compile_template(text) for key, text in templates.items()}
+    
+    def _message_fields(self, invoice: Invoice) -> Dict[str, str]:
+        """Build the template field values for an invoice."""
+        return {
+            "customer_name": invoice.customer_name,
+            "invoice_id": invoice.invoice_id,
+            "amount": f"{invoice.amount - invoice.amount_paid:,.2f}",
+            "due_date": invoice.due_date.strftime("%d %b %Y"),
+            "mpesa_number": self.mpesa_number
+        }
     
     def track_invoice(
         self,
@@ -196,6 +253,7 @@ class InvoiceCollectionTool:
         customer_name: str,
         amount: float,
         due_date: datetime,
+        now: Optional[datetime] = None,
         **kwargs
     ) -> Invoice:
         """
@@ -206,6 +264,8 @@ class InvoiceCollectionTool:
             customer_name: Customer name
             amount: Invoice amount
             due_date: Payment due date
+            now: Issue timestamp; pass one in when tracking a batch so the
+                clock is read once (defaults to datetime.utcnow())
             **kwargs: Additional invoice details
             
         Returns:
@@ -224,7 +284,7 @@ class InvoiceCollectionTool:
             amount=amount,
             amount_paid=0.0,
             due_date=due_date,
-            issue_date=datetime.utcnow(),
+            issue_date=now or datetime.utcnow(),
             status=InvoiceStatus.DRAFT,
             description=kwargs.get("description", ""),
             payment_method=kwargs.get("payment_method")
@@ -289,7 +349,8 @@ class InvoiceCollectionTool:
     def generate_follow_up(
         self,
         invoice: Invoice,
-        action_type: FollowUpAction = FollowUpAction.SEND_REMINDER
+        action_type: FollowUpAction = FollowUpAction.SEND_REMINDER,
+        now: Optional[datetime] = None
     ) -> FollowUpMessage:
         """
         Generate automated follow-up message for an invoice.
@@ -297,23 +358,20 @@ class InvoiceCollectionTool:
         Args:
             invoice: Invoice to follow up on
             action_type: Type of follow-up action
+            now: Reference time for overdue calculation and scheduling
+                (defaults to datetime.utcnow())
             
         Returns:
             FollowUpMessage object
         """
         logger.info(f"Generating follow-up for invoice {invoice.invoice_id} (placeholder)")
         
-        # Determine appropriate template
-        days_overdue = (datetime.utcnow() - invoice.due_date).days
+        now = now or datetime.utcnow()
         
-        if days_overdue <= 0:
-            template_key = "polite_reminder"
-        elif days_overdue <= 7:
-            template_key = "overdue_notice"
-        else:
-            template_key = "payment_plan"
+        # Determine appropriate template
+        days_overdue = (now - invoice.due_date).days
+        template_key = _select_template_key(days_overdue)
         
-        # TODO Milestone 2: Format message with invoice details
         # TODO Milestone 2: Schedule message delivery
         # TODO Milestone 2: Track follow-up history
         
@@ -321,13 +379,55 @@ class InvoiceCollectionTool:
             message_type=action_type,
             recipient=invoice.customer_name,
             phone_number=invoice.customer_phone,
-            message_text="[Placeholder] Follow-up message will be generated in Milestone 2",
-            scheduled_time=datetime.utcnow() + timedelta(hours=1),
+            message_text=self.message_templates[template_key](self._message_fields(invoice)),
+            scheduled_time=now + timedelta(hours=1),
             invoice_reference=invoice.invoice_id
         )
         
         return message
     
+    def generate_follow_ups_batch(
+        self,
+        invoices: List[Invoice],
+        action_type: FollowUpAction = FollowUpAction.SEND_REMINDER,
+        now: Optional[datetime] = None
+    ) -> List[FollowUpMessage]:
+        """
+        Generate follow-up messages for a batch of invoices.
+        
+        Template keys are resolved for the whole batch up front with a
+        threshold lookup instead of a per-invoice if/elif ladder.
+        
+        Args:
+            invoices: Invoices to follow up on
+            action_type: Type of follow-up action
+            now: Reference time shared by the whole batch
+                (defaults to datetime.utcnow())
+            
+        Returns:
+            List of FollowUpMessage objects, in input order
+        """
+        logger.info(f"Generating follow-ups for {len(invoices)} invoices (placeholder)")
+        
+        now = now or datetime.utcnow()
+        template_keys = [
+            _select_template_key((now - inv.due_date).days) for inv in invoices
+        ]
+        scheduled_time = now + timedelta(hours=1)
+        templates = self.message_templates
+        
+        return [
+            FollowUpMessage(
+                message_type=action_type,
+                recipient=inv.customer_name,
+                phone_number=inv.customer_phone,
+                message_text=templates[key](self._message_fields(inv)),
+                scheduled_time=scheduled_time,
+                invoice_reference=inv.invoice_id
+            )
+            for inv, key in zip(invoices, template_keys)
+        ]
+    
     def generate_collection_report(
         self,
         start_date: Optional[datetime] = None,
@@ -376,7 +476,8 @@ class InvoiceCollectionTool:
         logger.info("Sending batch reminders (placeholder)")
         
         # TODO Milestone 2: Fetch invoices matching criteria
-        # TODO Milestone 2: Generate messages for each
+        # TODO Milestone 2: Generate messages via generate_follow_ups_batch,
+        #                   reading datetime.utcnow() once for the whole batch
         # TODO Milestone 2: Queue for SMS delivery
         # TODO Milestone 2: Track delivery status
         
@@ -466,6 +567,8 @@ if __name__ == "__main__":
     print("Invoice Collection Tool - Test Run (Milestone 1)")
     print("=" * 60)
     
+    now = datetime.utcnow()
+    
     # Create sample invoice
     print("\nCreating sample invoice...")
     invoice = tool.track_invoice(
@@ -473,7 +576,8 @@ if __name__ == "__main__":
         customer_name="ABC Enterprises",
         customer_phone="254712345678",
         amount=15000.0,
-        due_date=datetime.utcnow() + timedelta(days=30),
+        due_date=now + timedelta(days=30),
+        now=now,
         description="Website development services"
     )
     
@@ -484,7 +588,7 @@ if __name__ == "__main__":
     
     # Generate follow-up
     print("\nGenerating follow-up message...")
-    follow_up = tool.generate_follow_up(invoice)
+    follow_up = tool.generate_follow_up(invoice, now=now)
     print(f"Message Type: {follow_up.message_type.value}")
     print(f"Recipient: {follow_up.recipient}")
     print(f"Scheduled: {follow_up.scheduled_time}")
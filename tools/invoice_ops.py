@@ -20,22 +20,64 @@ Author: Alfred Munga
 License: MIT
 """
 
+import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-# Import Daraja service
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Make the backend package importable; DarajaService itself is imported
+# lazily by SendPaymentRequestTool so read-only tools skip its dotenv load
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
-from backend.services.daraja_service import DarajaService, PaymentStatus
+if TYPE_CHECKING:
+    from backend.services.daraja_service import DarajaService
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Invoice statuses that count as outstanding
+UNPAID_STATUSES = ('unpaid', 'overdue', 'pending')
+UNPAID_STATUSES_WITH_PENDING = UNPAID_STATUSES + ('processing',)
+
+
+def _materialize_invoice(invoice: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill derived fields once at load so readers skip per-call fallbacks."""
+    invoice.setdefault('amount_outstanding', invoice.get('amount', 0))
+    return invoice
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(date_str: str) -> datetime:
+    """Parse an ISO-8601 timestamp (memoized; due dates repeat across invoices)."""
+    # Stored dates are naive isoformat() output; only rewrite a 'Z' suffix
+    # (unsupported by fromisoformat before Python 3.11) when one is present
+    if date_str.endswith('Z'):
+        date_str = date_str[:-1] + '+00:00'
+    return datetime.fromisoformat(date_str)
+
 
 # ============================================================================
 # Pydantic Models for Tool Inputs
@@ -67,6 +109,9 @@ class SendPaymentRequestInput(BaseModel):
         invoice_id: The invoice ID to collect payment for
         force: Whether to bypass idempotency checks (use with caution)
     """
+    # Frozen so inputs are hashable and can key caches at the batch layer
+    model_config = ConfigDict(frozen=True)
+    
     invoice_id: str = Field(
         ...,
         description="The invoice ID (e.g., 'INV-2025-1804')"
@@ -91,65 +136,194 @@ class SendPaymentRequestInput(BaseModel):
 # Invoice Data Manager
 # ============================================================================
 
-class InvoiceDataManager:
+class InvoiceStore(ABC):
+    """
+    Interface the invoice tools use to read and update invoices.
+    
+    Holds no invoice data itself; InvoiceDataManager keeps invoices in a
+    JSON file and SQLiteInvoiceDataManager in a SQLite database.
+    
+    Attributes:
+        lock: Re-entrant lock serializing access to the store
+    """
+    
+    def __init__(self):
+        """Initialize the store lock."""
+        self.lock = threading.RLock()
+    
+    @abstractmethod
+    def get_invoice_by_id(self, invoice_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single invoice by ID.
+        
+        Args:
+            invoice_id: The invoice ID
+            
+        Returns:
+            Invoice dict or None if not found
+        """
+    
+    @abstractmethod
+    def update_invoice_status(
+        self,
+        invoice_id: str,
+        status: str,
+        payment_info: Optional[Dict[str, Any]] = None,
+        persist: bool = True
+    ) -> bool:
+        """
+        Update invoice status and optionally payment information.
+        
+        Args:
+            invoice_id: The invoice ID
+            status: New status ('paid', 'processing', 'overdue', etc.)
+            payment_info: Optional payment details to store
+            persist: Save the change now rather than on the next flush()
+            
+        Returns:
+            True if updated successfully, False if invoice not found
+        """
+    
+    @abstractmethod
+    def get_unpaid_invoices(
+        self,
+        include_pending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all unpaid invoices.
+        
+        Args:
+            include_pending: Include invoices with status 'processing'
+            
+        Returns:
+            List of unpaid invoices
+        """
+    
+    @abstractmethod
+    def flush(self) -> None:
+        """Persist status updates made with persist=False, if any."""
+
+
+class InvoiceDataManager(InvoiceStore):
     """
     Manages invoice data persistence and retrieval.
     
     This class handles reading and writing invoice data to/from JSON files,
     with proper error handling and data validation.
     
+    Updates and listings hold the store lock, so the status buckets are
+    never read mid-update by another thread.
+    
+    Invoices are indexed by ID and bucketed by status at load time, so
+    lookups and unpaid listings never scan the full list. Status updates
+    are saved immediately unless made with persist=False, in which case
+    the caller persists them with flush(); a batch of K updates then costs
+    one file write instead of K.
+    
     Attributes:
         data_path: Path to invoices.json file
         invoices: Cached list of invoices
+        pretty: Whether saved JSON is indented for human reading
     """
     
-    def __init__(self, data_path: Optional[str] = None):
+    def __init__(self, data_path: Optional[str] = None, pretty: bool = False):
         """
         Initialize the invoice data manager.
         
         Args:
             data_path: Path to invoices.json (uses default if not provided)
+            pretty: Indent saved JSON (compact by default)
         """
+        super().__init__()
         if data_path is None:
             project_root = Path(__file__).parent.parent
             data_path = project_root / "data" / "synthetic" / "invoices.json"
         
         self.data_path = Path(data_path)
+        self.pretty = pretty
         self.invoices: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._by_status: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._dirty = False
         self._load_invoices()
     
     def _load_invoices(self) -> None:
-        """Load invoices from JSON file."""
+        """
+        Load invoices from JSON file.
+        
+        Streams the array with ijson (C yajl2 backend) when installed, which
+        avoids holding the raw document and the parsed list at the same time.
+        """
         try:
             if not self.data_path.exists():
-                logger.warning(f"Invoice file not found: {self.data_path}")
+                logger.warning("Invoice file not found: %s", self.data_path)
                 self.invoices = []
                 return
             
-            with open(self.data_path, 'r') as f:
-                self.invoices = json.load(f)
+            if IJSON_AVAILABLE:
+                with open(self.data_path, 'rb') as f:
+                    self.invoices = list(ijson.items(f, 'item', use_float=True))
+            else:
+                with open(self.data_path, 'r') as f:
+                    self.invoices = json.load(f)
             
-            logger.info(f"Loaded {len(self.invoices)} invoices from {self.data_path}")
+            logger.info("Loaded %d invoices from %s", len(self.invoices), self.data_path)
         
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in {self.data_path}: {str(e)}")
+            logger.error("Invalid JSON in %s: %s", self.data_path, e)
             self.invoices = []
         except Exception as e:
-            logger.error(f"Error loading invoices: {str(e)}")
+            logger.error("Error loading invoices: %s", e)
             self.invoices = []
+        finally:
+            self._build_indexes()
+    
+    def _build_indexes(self) -> None:
+        """Build the ID index and status buckets from the invoice list."""
+        self._index = {}
+        self._by_status = {}
+        for inv in self.invoices:
+            _materialize_invoice(inv)
+            invoice_id = inv.get('invoice_id')
+            self._index[invoice_id] = inv
+            self._by_status.setdefault(inv.get('status', '').lower(), {})[invoice_id] = inv
     
     def save_invoices(self) -> None:
-        """Save invoices to JSON file."""
+        """
+        Save invoices to JSON file.
+        
+        Encodes with orjson when installed, writes to a temp file and
+        atomically swaps it in, so a crash mid-write never leaves a
+        truncated invoices.json behind.
+        """
         try:
-            with open(self.data_path, 'w') as f:
-                json.dump(self.invoices, f, indent=2)
+            if ORJSON_AVAILABLE:
+                option = orjson.OPT_APPEND_NEWLINE
+                if self.pretty:
+                    option |= orjson.OPT_INDENT_2
+                data = orjson.dumps(self.invoices, option=option)
+            elif self.pretty:
+                data = (json.dumps(self.invoices, indent=2) + "\n").encode()
+            else:
+                data = (json.dumps(self.invoices, separators=(',', ':')) + "\n").encode()
+            
+            tmp_path = self.data_path.with_name(self.data_path.name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.data_path)
             
-            logger.info(f"Saved {len(self.invoices)} invoices to {self.data_path}")
+            self._dirty = False
+            logger.info("Saved %d invoices to %s", len(self.invoices), self.data_path)
         
         except Exception as e:
-            logger.error(f"Error saving invoices: {str(e)}")
+            logger.error("Error saving invoices: %s", e)
             raise
     
+    def flush(self) -> None:
+        """Persist status updates made with persist=False, if any."""
+        with self.lock:
+            if self._dirty:
+                self.save_invoices()
+    
     def get_invoice_by_id(self, invoice_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a single invoice by ID.
@@ -160,16 +334,14 @@ class InvoiceDataManager:
         Returns:
             Invoice dict or None if not found
         """
-        for invoice in self.invoices:
-            if invoice.get('invoice_id') == invoice_id:
-                return invoice
-        return None
+        return self._index.get(invoice_id)
     
     def update_invoice_status(
         self,
         invoice_id: str,
         status: str,
-        payment_info: Optional[Dict[str, Any]] = None
+        payment_info: Optional[Dict[str, Any]] = None,
+        persist: bool = True
     ) -> bool:
         """
         Update invoice status and optionally payment information.
@@ -178,25 +350,225 @@ class InvoiceDataManager:
             invoice_id: The invoice ID
             status: New status ('paid', 'processing', 'overdue', etc.)
             payment_info: Optional payment details to store
+            persist: Save the file now; with False the change is only made
+                in memory and the caller must call flush() to keep it
             
         Returns:
             True if updated successfully, False if invoice not found
         """
-        invoice = self.get_invoice_by_id(invoice_id)
+        with self.lock:
+            invoice = self.get_invoice_by_id(invoice_id)
+            
+            if not invoice:
+                logger.warning("Invoice not found for update: %s", invoice_id)
+                return False
+            
+            old_status = invoice.get('status', '').lower()
+            new_status = status.lower()
+            if old_status == new_status and not payment_info:
+                logger.debug("No-op update for %s", invoice_id)
+                return True
+            
+            self._by_status.get(old_status, {}).pop(invoice_id, None)
+            self._by_status.setdefault(new_status, {})[invoice_id] = invoice
+            
+            invoice['status'] = new_status
+            invoice['updated_at'] = datetime.now().isoformat()
+            
+            if payment_info:
+                invoice['payment_info'] = payment_info
+            
+            self._dirty = True
+            if persist:
+                self.save_invoices()
         
-        if not invoice:
-            logger.warning(f"Invoice not found for update: {invoice_id}")
-            return False
+        logger.info("Updated invoice %s: status=%s", invoice_id, status)
+        return True
+    
+    def get_unpaid_invoices(
+        self,
+        include_pending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all unpaid invoices.
+        
+        Args:
+            include_pending: Include invoices with status 'processing'
+            
+        Returns:
+            List of unpaid invoices, grouped by status
+        """
+        unpaid_statuses = UNPAID_STATUSES_WITH_PENDING if include_pending else UNPAID_STATUSES
+        
+        with self.lock:
+            return [
+                inv
+                for status in unpaid_statuses
+                for inv in self._by_status.get(status, {}).values()
+            ]
+
+
+class SQLiteInvoiceDataManager(InvoiceStore):
+    """
+    SQLite-backed InvoiceStore, a drop-in alternative to InvoiceDataManager.
+    
+    Lookups and status updates are single-row statements against an indexed
+    table instead of a scan plus whole-file JSON rewrite. Each invoice is
+    stored as its full JSON record alongside indexed invoice_id/status
+    columns, so no fields are lost. An empty database is seeded from the
+    JSON invoice file on first use. The single connection is shared across
+    threads, so every use of it holds the store lock.
+    
+    Usage:
+        manager = SQLiteInvoiceDataManager()
+        tool = GetUnpaidInvoicesTool(data_manager=manager)
+    
+    Attributes:
+        db_path: Path to the SQLite database file
+        json_path: JSON invoice file used to seed an empty database
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        json_path: Optional[str] = None
+    ):
+        """
+        Initialize the SQLite invoice store.
+        
+        Args:
+            db_path: Path to the database (defaults to json_path with a .db suffix)
+            json_path: Path to invoices.json to migrate from (uses default if not provided)
+        """
+        super().__init__()
+        if json_path is None:
+            project_root = Path(__file__).parent.parent
+            json_path = project_root / "data" / "synthetic" / "invoices.json"
+        
+        self.json_path = Path(json_path)
+        self.db_path = Path(db_path) if db_path else self.json_path.with_suffix('.db')
+        
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._migrate_from_json()
+    
+    def _create_schema(self) -> None:
+        """Create the invoices table and status index if missing."""
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS invoices ("
+                "invoice_id TEXT PRIMARY KEY, "
+                "status TEXT NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status)"
+            )
+    
+    def _migrate_from_json(self) -> None:
+        """Seed an empty database from the JSON invoice file."""
+        if self._conn.execute("SELECT 1 FROM invoices LIMIT 1").fetchone():
+            return
         
-        invoice['status'] = status.lower()
-        invoice['updated_at'] = datetime.now().isoformat()
+        if not self.json_path.exists():
+            logger.warning("Invoice file not found, starting empty: %s", self.json_path)
+            return
         
-        if payment_info:
-            invoice['payment_info'] = payment_info
+        try:
+            with open(self.json_path, 'r') as f:
+                invoices = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON in %s: %s", self.json_path, e)
+            return
         
-        self.save_invoices()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO invoices (invoice_id, status, data) VALUES (?, ?, ?)",
+                [
+                    (
+                        inv.get('invoice_id'),
+                        inv.get('status', '').lower(),
+                        json.dumps(_materialize_invoice(inv))
+                    )
+                    for inv in invoices
+                ]
+            )
         
-        logger.info(f"Updated invoice {invoice_id}: status={status}")
+        logger.info(
+            "Migrated %d invoices from %s to %s", len(invoices), self.json_path, self.db_path
+        )
+    
+    def flush(self) -> None:
+        """Commit any open transaction (updates are written per row)."""
+        with self.lock:
+            self._conn.commit()
+    
+    def get_invoice_by_id(self, invoice_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single invoice by ID.
+        
+        Args:
+            invoice_id: The invoice ID
+            
+        Returns:
+            Invoice dict or None if not found
+        """
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT data FROM invoices WHERE invoice_id = ? LIMIT 1",
+                (invoice_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def update_invoice_status(
+        self,
+        invoice_id: str,
+        status: str,
+        payment_info: Optional[Dict[str, Any]] = None,
+        persist: bool = True
+    ) -> bool:
+        """
+        Update invoice status and optionally payment information.
+        
+        Each update is committed as its own row write, so persist is
+        accepted for interface compatibility only.
+        
+        Args:
+            invoice_id: The invoice ID
+            status: New status ('paid', 'processing', 'overdue', etc.)
+            payment_info: Optional payment details to store
+            persist: Ignored; updates are always committed
+            
+        Returns:
+            True if updated successfully, False if invoice not found
+        """
+        with self.lock:
+            invoice = self.get_invoice_by_id(invoice_id)
+            
+            if not invoice:
+                logger.warning("Invoice not found for update: %s", invoice_id)
+                return False
+            
+            new_status = status.lower()
+            if invoice.get('status', '').lower() == new_status and not payment_info:
+                logger.debug("No-op update for %s", invoice_id)
+                return True
+            
+            invoice['status'] = new_status
+            invoice['updated_at'] = datetime.now().isoformat()
+            
+            if payment_info:
+                invoice['payment_info'] = payment_info
+            
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE invoices SET status = ?, data = ? WHERE invoice_id = ?",
+                    (invoice['status'], json.dumps(invoice), invoice_id)
+                )
+        
+        logger.info("Updated invoice %s: status=%s", invoice_id, status)
         return True
     
     def get_unpaid_invoices(
@@ -212,15 +584,32 @@ class InvoiceDataManager:
         Returns:
             List of unpaid invoices
         """
-        unpaid_statuses = ['unpaid', 'overdue', 'pending']
+        unpaid_statuses = UNPAID_STATUSES_WITH_PENDING if include_pending else UNPAID_STATUSES
         
-        if include_pending:
-            unpaid_statuses.append('processing')
+        placeholders = ", ".join("?" for _ in unpaid_statuses)
+        with self.lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM invoices WHERE status IN ({placeholders})",
+                unpaid_statuses
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_data_manager(data_path: Optional[str] = None) -> InvoiceDataManager:
+    """
+    Get the shared InvoiceDataManager for a data file.
+    
+    Tools default to this so that all tools in a process parse the invoice
+    file once and see the same in-memory state.
+    
+    Args:
+        data_path: Path to invoices.json (uses default if not provided)
         
-        return [
-            inv for inv in self.invoices
-            if inv.get('status', '').lower() in unpaid_statuses
-        ]
+    Returns:
+        Process-wide InvoiceDataManager for that path
+    """
+    return InvoiceDataManager(data_path)
 
 
 # ============================================================================
@@ -258,14 +647,14 @@ class GetUnpaidInvoicesTool:
     Returns: List of invoices with ID, customer name, amount due, and due date.
     """
     
-    def __init__(self, data_manager: Optional[InvoiceDataManager] = None):
+    def __init__(self, data_manager: Optional[InvoiceStore] = None):
         """
         Initialize the tool.
         
         Args:
-            data_manager: Invoice data manager (creates new if not provided)
+            data_manager: Invoice data manager (shared default if not provided)
         """
-        self.data_manager = data_manager or InvoiceDataManager()
+        self.data_manager = data_manager or get_data_manager()
     
     def run(self, input_data: GetUnpaidInvoicesInput) -> Dict[str, Any]:
         """
@@ -289,29 +678,31 @@ class GetUnpaidInvoicesTool:
                 include_pending=input_data.include_pending
             )
             
-            # Extract only essential fields (context optimization)
-            essential_fields = []
-            total_amount = 0.0
+            now = datetime.now()
             
-            for inv in unpaid:
-                essential_fields.append({
+            # Extract only essential fields (context optimization)
+            essential_fields = [
+                {
                     'invoice_id': inv.get('invoice_id'),
                     'customer_name': inv.get('customer_name'),
                     'customer_phone': inv.get('customer_phone'),
-                    'amount_outstanding': inv.get('amount_outstanding', inv.get('amount', 0)),
+                    'amount_outstanding': inv['amount_outstanding'],
                     'due_date': inv.get('due_date'),
                     'status': inv.get('status'),
-                    'days_overdue': self._calculate_days_overdue(inv.get('due_date'))
-                })
-                
-                total_amount += inv.get('amount_outstanding', inv.get('amount', 0))
+                    'days_overdue': self._calculate_days_overdue(inv.get('due_date'), now)
+                }
+                for inv in unpaid
+            ]
+            total_amount = sum(
+                (row['amount_outstanding'] for row in essential_fields), 0.0
+            )
             
             # Sort by days overdue (most overdue first)
-            essential_fields.sort(key=lambda x: x['days_overdue'], reverse=True)
+            essential_fields.sort(key=itemgetter('days_overdue'), reverse=True)
             
             logger.info(
-                f"Retrieved {len(essential_fields)} unpaid invoices, "
-                f"Total: KES {total_amount:,.2f}"
+                "Retrieved %d unpaid invoices, Total: KES %.2f",
+                len(essential_fields), total_amount
             )
             
             return {
@@ -323,7 +714,7 @@ class GetUnpaidInvoicesTool:
             }
         
         except Exception as e:
-            logger.error(f"Error retrieving unpaid invoices: {str(e)}")
+            logger.error("Error retrieving unpaid invoices: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -332,12 +723,17 @@ class GetUnpaidInvoicesTool:
                 'total_amount': 0
             }
     
-    def _calculate_days_overdue(self, due_date_str: str) -> int:
+    def _calculate_days_overdue(
+        self,
+        due_date_str: str,
+        now: Optional[datetime] = None
+    ) -> int:
         """
         Calculate number of days overdue.
         
         Args:
             due_date_str: Due date as ISO string
+            now: Reference time, shared across a batch (defaults to datetime.now())
             
         Returns:
             Number of days overdue (0 if not overdue)
@@ -346,8 +742,8 @@ class GetUnpaidInvoicesTool:
             return 0
         
         try:
-            due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
-            days = (datetime.now() - due_date).days
+            due_date = _parse_iso(due_date_str)
+            days = ((now or datetime.now()) - due_date).days
             return max(0, days)
         except Exception:
             return 0
@@ -406,18 +802,21 @@ class SendPaymentRequestTool:
     
     def __init__(
         self,
-        data_manager: Optional[InvoiceDataManager] = None,
-        daraja_service: Optional[DarajaService] = None
+        data_manager: Optional[InvoiceStore] = None,
+        daraja_service: Optional["DarajaService"] = None
     ):
         """
         Initialize the tool.
         
         Args:
-            data_manager: Invoice data manager
+            data_manager: Invoice data manager (shared default if not provided)
             daraja_service: Daraja M-Pesa service
         """
-        self.data_manager = data_manager or InvoiceDataManager()
-        self.daraja_service = daraja_service or DarajaService()
+        self.data_manager = data_manager or get_data_manager()
+        if daraja_service is None:
+            from backend.services.daraja_service import DarajaService
+            daraja_service = DarajaService()
+        self.daraja_service = daraja_service
     
     def run(self, input_data: SendPaymentRequestInput) -> Dict[str, Any]:
         """
@@ -434,143 +833,444 @@ class SendPaymentRequestTool:
         Returns:
             Dict with payment request result
         """
-        invoice_id = input_data.invoice_id
+        return self.run_unchecked(input_data.invoice_id, input_data.force)
+    
+    def run_unchecked(self, invoice_id: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Send a payment request without building a SendPaymentRequestInput.
+        
+        For trusted internal callers that already hold a well-formed invoice
+        ID; the 'INV-' format check is skipped. LLM tool calls should go
+        through run() so their arguments are validated.
+        
+        Args:
+            invoice_id: The invoice ID
+            force: Bypass the PROCESSING idempotency check
+            
+        Returns:
+            Dict with payment request result
+        """
+        result = self._send(invoice_id, force)
+        save_error = self._flush()
+        if save_error is not None:
+            return {
+                'success': False,
+                'error': save_error,
+                'invoice_id': invoice_id
+            }
+        return result
+    
+    def run_many(
+        self,
+        inputs: List[SendPaymentRequestInput],
+        max_workers: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Send payment requests for several invoices on a thread pool.
         
-        try:
-            # Step 1: Get invoice
-            invoice = self.data_manager.get_invoice_by_id(invoice_id)
+        Blocking alternative to run_batch for callers that cannot use
+        asyncio. STK pushes overlap across worker threads; each invoice is
+        checked and reserved under the store lock before its push, and the
+        store is written once at the end.
+        
+        Args:
+            inputs: Tool input parameters, one per invoice
+            max_workers: Maximum number of concurrent STK pushes
             
-            if not invoice:
-                logger.warning(f"Invoice not found: {invoice_id}")
-                return {
+        Returns:
+            List of payment request results, in input order; each carries
+            'save_error' if the invoice updates could not be saved
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        to_send: List[Tuple[int, SendPaymentRequestInput]] = []
+        seen = set()
+        
+        for i, input_data in enumerate(inputs):
+            invoice_id = input_data.invoice_id
+            if invoice_id in seen:
+                results[i] = {
                     'success': False,
-                    'error': f"Invoice {invoice_id} not found",
+                    'error': f"Duplicate payment request for invoice {invoice_id} in batch",
+                    'reason': 'idempotency_check',
                     'invoice_id': invoice_id
                 }
+                continue
+            seen.add(invoice_id)
+            to_send.append((i, input_data))
+        
+        if to_send:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                sent = executor.map(
+                    lambda item: self._send(item[1].invoice_id, item[1].force),
+                    to_send
+                )
+                for (i, _), result in zip(to_send, sent):
+                    results[i] = result
+        
+        return self._flush_batch(results)
+    
+    def run_batch(self, inputs: List[SendPaymentRequestInput]) -> List[Dict[str, Any]]:
+        """
+        Send payment requests for several invoices concurrently.
+        
+        Blocking wrapper around run_batch_async; use run_batch_async directly
+        from code that already runs inside an event loop.
+        
+        Args:
+            inputs: Tool input parameters, one per invoice
             
-            # Step 2: Idempotency check - is it already paid?
-            if invoice.get('status', '').lower() == 'paid':
-                logger.info(f"Invoice {invoice_id} is already PAID")
-                return {
-                    'success': False,
-                    'error': f"Invoice {invoice_id} is already PAID",
-                    'reason': 'idempotency_check',
-                    'invoice_id': invoice_id,
-                    'status': 'paid',
-                    'message': (
-                        f"Cannot send payment request for invoice {invoice_id}. "
-                        f"This invoice was already paid on {invoice.get('payment_date', 'unknown date')}."
-                    )
-                }
+        Returns:
+            List of payment request results, in input order; each carries
+            'save_error' if the invoice updates could not be saved
+        """
+        return asyncio.run(self.run_batch_async(inputs))
+    
+    async def run_batch_async(
+        self,
+        inputs: List[SendPaymentRequestInput]
+    ) -> List[Dict[str, Any]]:
+        """
+        Send payment requests for several invoices concurrently.
+        
+        Idempotency checks and reservations run up front, then all
+        STK pushes are awaited together so a batch of K invoices takes about
+        one round-trip instead of K. Status updates are persisted with a
+        single write at the end.
+        
+        Args:
+            inputs: Tool input parameters, one per invoice
             
-            # Step 3: Idempotency check - is payment already processing?
-            if invoice.get('status', '').lower() == 'processing' and not input_data.force:
-                logger.info(f"Invoice {invoice_id} is already PROCESSING")
-                payment_info = invoice.get('payment_info', {})
-                checkout_id = payment_info.get('checkout_request_id', 'unknown')
-                
-                return {
+        Returns:
+            List of payment request results, in input order; each carries
+            'save_error' if the invoice updates could not be saved
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        to_send: List[Tuple[int, Dict[str, Any]]] = []
+        seen = set()
+        
+        for i, input_data in enumerate(inputs):
+            invoice_id = input_data.invoice_id
+            if invoice_id in seen:
+                results[i] = {
                     'success': False,
-                    'error': f"Payment request already in progress for invoice {invoice_id}",
+                    'error': f"Duplicate payment request for invoice {invoice_id} in batch",
                     'reason': 'idempotency_check',
-                    'invoice_id': invoice_id,
-                    'status': 'processing',
-                    'checkout_request_id': checkout_id,
-                    'message': (
-                        f"Cannot send duplicate payment request for invoice {invoice_id}. "
-                        f"A payment request is already being processed (Checkout ID: {checkout_id}). "
-                        f"Please wait for the customer to complete the current request or check "
-                        f"its status before sending another."
-                    )
+                    'invoice_id': invoice_id
                 }
+                continue
+            seen.add(invoice_id)
             
-            # Step 4: Validate invoice has required fields
-            phone = invoice.get('customer_phone')
-            amount = invoice.get('amount_outstanding', invoice.get('amount'))
-            
-            if not phone:
-                return {
+            checked = self._reserve(invoice_id, input_data.force)
+            if checked['success']:
+                to_send.append((i, checked))
+            else:
+                results[i] = checked
+        
+        responses = await asyncio.gather(
+            *[
+                self.daraja_service.trigger_stk_push_async(**self._stk_push_args(checked))
+                for _, checked in to_send
+            ],
+            return_exceptions=True
+        )
+        
+        for (i, checked), payment_response in zip(to_send, responses):
+            invoice_id = checked['invoice_id']
+            if isinstance(payment_response, Exception):
+                logger.error(
+                    "Error sending payment request for %s: %s", invoice_id, payment_response
+                )
+                self._release(checked)
+                results[i] = {
                     'success': False,
-                    'error': f"Invoice {invoice_id} has no customer phone number",
+                    'error': str(payment_response),
                     'invoice_id': invoice_id
                 }
+            else:
+                results[i] = self._record_payment_request(checked, payment_response)
+                if not results[i]['success']:
+                    self._release(checked)
+        
+        return self._flush_batch(results)
+    
+    def _flush(self) -> Optional[str]:
+        """
+        Persist pending invoice updates.
+        
+        Returns:
+            None on success, else the error message (already logged)
+        """
+        try:
+            self.data_manager.flush()
+        except Exception as e:
+            logger.error("Error saving invoice updates: %s", e)
+            return str(e)
+        return None
+    
+    def _flush_batch(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Persist a batch's invoice updates without losing its results.
+        
+        STK pushes have already been sent by now, so a failed save is
+        reported on every result under 'save_error' instead of raising.
+        
+        Args:
+            results: Per-invoice results of the batch
             
-            # Normalize phone number: Remove + prefix if present
-            phone = phone.strip()
-            if phone.startswith('+'):
-                phone = phone[1:]  # Remove the '+' prefix
+        Returns:
+            The same results
+        """
+        save_error = self._flush()
+        if save_error is not None:
+            for result in results:
+                result['save_error'] = save_error
+        return results
+    
+    def _send(self, invoice_id: str, force: bool) -> Dict[str, Any]:
+        """
+        Validate, push and record a single payment request without flushing.
+        
+        Safe to call from several threads at once: the invoice is reserved
+        under the store lock before the push, so only one caller can send
+        for it.
+        
+        Args:
+            invoice_id: The invoice ID
+            force: Bypass the PROCESSING idempotency check
             
-            if not amount or amount <= 0:
-                return {
-                    'success': False,
-                    'error': f"Invoice {invoice_id} has invalid amount: {amount}",
-                    'invoice_id': invoice_id
-                }
+        Returns:
+            Dict with payment request result
+        """
+        try:
+            # Steps 1-4: Idempotency checks, field validation and reservation
+            checked = self._reserve(invoice_id, force)
+            if not checked['success']:
+                return checked
             
             # Step 5: Initiate STK Push via Daraja Service
-            logger.info(
-                f"Initiating payment request: {invoice_id} - "
-                f"KES {amount:,.2f} to {phone}"
-            )
-            
-            payment_response = self.daraja_service.trigger_stk_push(
-                phone_number=phone,
-                amount=amount,
-                reference=invoice_id,
-                description=f"Payment for {invoice.get('description', 'Invoice')}"
-            )
+            try:
+                payment_response = self.daraja_service.trigger_stk_push(
+                    **self._stk_push_args(checked)
+                )
+            except Exception:
+                self._release(checked)
+                raise
             
-            if not payment_response.get('success'):
-                return {
-                    'success': False,
-                    'error': 'Failed to initiate payment request',
-                    'details': payment_response,
-                    'invoice_id': invoice_id
-                }
+            # Steps 6-7: Record PROCESSING state and build response
+            result = self._record_payment_request(checked, payment_response)
+            if not result['success']:
+                self._release(checked)
+            return result
+        
+        except Exception as e:
+            logger.error("Error sending payment request for %s: %s", invoice_id, e)
+            return {
+                'success': False,
+                'error': str(e),
+                'invoice_id': invoice_id
+            }
+    
+    def _reserve(self, invoice_id: str, force: bool) -> Dict[str, Any]:
+        """
+        Validate a request and mark the invoice PROCESSING in one step.
+        
+        Both happen under the store lock, so a concurrent request for the
+        same invoice fails the idempotency check instead of sending a
+        second STK push.
+        
+        Args:
+            invoice_id: The invoice ID
+            force: Bypass the PROCESSING idempotency check
             
-            # Step 6: Update invoice status to PROCESSING
-            self.data_manager.update_invoice_status(
-                invoice_id=invoice_id,
-                status='processing',
-                payment_info={
-                    'checkout_request_id': payment_response.get('checkout_request_id'),
-                    'merchant_request_id': payment_response.get('merchant_request_id'),
-                    'payment_initiated_at': datetime.now().isoformat(),
-                    'phone_number': phone,
-                    'amount': amount
-                }
-            )
+        Returns:
+            The _validate_request result; on success it also carries the
+            invoice's 'previous_status' for _release
+        """
+        with self.data_manager.lock:
+            checked = self._validate_request(invoice_id, force)
+            if checked['success']:
+                checked['previous_status'] = checked['invoice'].get('status', '')
+                self.data_manager.update_invoice_status(
+                    invoice_id, 'processing', persist=False
+                )
+        return checked
+    
+    def _release(self, checked: Dict[str, Any]) -> None:
+        """Restore the status a failed request's invoice had before _reserve."""
+        self.data_manager.update_invoice_status(
+            checked['invoice_id'], checked['previous_status'], persist=False
+        )
+    
+    def _validate_request(self, invoice_id: str, force: bool) -> Dict[str, Any]:
+        """
+        Run idempotency checks and validate invoice fields.
+        
+        Args:
+            invoice_id: The invoice ID
+            force: Bypass the PROCESSING idempotency check
             
-            logger.info(
-                f"✅ Payment request sent successfully: {invoice_id} - "
-                f"Checkout ID: {payment_response.get('checkout_request_id')}"
-            )
+        Returns:
+            Error response dict with success=False, or a dict with
+            success=True and the 'invoice', normalized 'phone' and 'amount'
+        """
+        # Step 1: Get invoice
+        invoice = self.data_manager.get_invoice_by_id(invoice_id)
+        
+        if not invoice:
+            logger.warning("Invoice not found: %s", invoice_id)
+            return {
+                'success': False,
+                'error': f"Invoice {invoice_id} not found",
+                'invoice_id': invoice_id
+            }
+        
+        # Step 2: Idempotency check - is it already paid?
+        if invoice.get('status', '').lower() == 'paid':
+            logger.info("Invoice %s is already PAID", invoice_id)
+            return {
+                'success': False,
+                'error': f"Invoice {invoice_id} is already PAID",
+                'reason': 'idempotency_check',
+                'invoice_id': invoice_id,
+                'status': 'paid',
+                'message': (
+                    f"Cannot send payment request for invoice {invoice_id}. "
+                    f"This invoice was already paid on {invoice.get('payment_date', 'unknown date')}."
+                )
+            }
+        
+        # Step 3: Idempotency check - is payment already processing?
+        if invoice.get('status', '').lower() == 'processing' and not force:
+            logger.info("Invoice %s is already PROCESSING", invoice_id)
+            payment_info = invoice.get('payment_info', {})
+            checkout_id = payment_info.get('checkout_request_id', 'unknown')
             
-            # Step 7: Return success response
             return {
-                'success': True,
+                'success': False,
+                'error': f"Payment request already in progress for invoice {invoice_id}",
+                'reason': 'idempotency_check',
                 'invoice_id': invoice_id,
-                'customer_name': invoice.get('customer_name'),
-                'customer_phone': phone,
-                'amount': amount,
-                'currency': 'KES',
-                'checkout_request_id': payment_response.get('checkout_request_id'),
-                'merchant_request_id': payment_response.get('merchant_request_id'),
                 'status': 'processing',
+                'checkout_request_id': checkout_id,
                 'message': (
-                    f"Payment request sent successfully to {invoice.get('customer_name')} "
-                    f"({phone}) for KES {amount:,.2f}. "
-                    f"The customer will receive a payment prompt on their phone."
+                    f"Cannot send duplicate payment request for invoice {invoice_id}. "
+                    f"A payment request is already being processed (Checkout ID: {checkout_id}). "
+                    f"Please wait for the customer to complete the current request or check "
+                    f"its status before sending another."
                 )
             }
         
-        except Exception as e:
-            logger.error(f"Error sending payment request for {invoice_id}: {str(e)}")
+        # Step 4: Validate invoice has required fields
+        phone = invoice.get('customer_phone')
+        amount = invoice['amount_outstanding']
+        
+        if not phone:
             return {
                 'success': False,
-                'error': str(e),
+                'error': f"Invoice {invoice_id} has no customer phone number",
                 'invoice_id': invoice_id
             }
+        
+        # Normalize phone number: Remove + prefix if present
+        phone = phone.strip().lstrip('+')
+        
+        if not amount or amount <= 0:
+            return {
+                'success': False,
+                'error': f"Invoice {invoice_id} has invalid amount: {amount}",
+                'invoice_id': invoice_id
+            }
+        
+        return {
+            'success': True,
+            'invoice_id': invoice_id,
+            'invoice': invoice,
+            'phone': phone,
+            'amount': amount
+        }
+    
+    def _stk_push_args(self, checked: Dict[str, Any]) -> Dict[str, Any]:
+        """Build DarajaService.trigger_stk_push arguments for a validated request."""
+        invoice_id = checked['invoice_id']
+        
+        logger.info(
+            "Initiating payment request: %s - KES %.2f to %s",
+            invoice_id, checked['amount'], checked['phone']
+        )
+        
+        return {
+            'phone_number': checked['phone'],
+            'amount': checked['amount'],
+            'reference': invoice_id,
+            'description': f"Payment for {checked['invoice'].get('description', 'Invoice')}"
+        }
+    
+    def _record_payment_request(
+        self,
+        checked: Dict[str, Any],
+        payment_response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Mark the invoice PROCESSING and build the tool response.
+        
+        The status update is made in memory; callers flush the data manager.
+        
+        Args:
+            checked: Validated request from _validate_request
+            payment_response: Response from DarajaService.trigger_stk_push
+            
+        Returns:
+            Dict with payment request result
+        """
+        invoice_id = checked['invoice_id']
+        invoice = checked['invoice']
+        phone = checked['phone']
+        amount = checked['amount']
+        
+        if not payment_response.get('success'):
+            return {
+                'success': False,
+                'error': 'Failed to initiate payment request',
+                'details': payment_response,
+                'invoice_id': invoice_id
+            }
+        
+        # Step 6: Update invoice status to PROCESSING
+        self.data_manager.update_invoice_status(
+            invoice_id=invoice_id,
+            status='processing',
+            payment_info={
+                'checkout_request_id': payment_response.get('checkout_request_id'),
+                'merchant_request_id': payment_response.get('merchant_request_id'),
+                'payment_initiated_at': datetime.now().isoformat(),
+                'phone_number': phone,
+                'amount': amount
+            },
+            persist=False
+        )
+        
+        logger.info(
+            "✅ Payment request sent successfully: %s - Checkout ID: %s",
+            invoice_id, payment_response.get('checkout_request_id')
+        )
+        
+        # Step 7: Return success response
+        return {
+            'success': True,
+            'invoice_id': invoice_id,
+            'customer_name': invoice.get('customer_name'),
+            'customer_phone': phone,
+            'amount': amount,
+            'currency': 'KES',
+            'checkout_request_id': payment_response.get('checkout_request_id'),
+            'merchant_request_id': payment_response.get('merchant_request_id'),
+            'status': 'processing',
+            'message': (
+                f"Payment request sent successfully to {invoice.get('customer_name')} "
+                f"({phone}) for KES {amount:,.2f}. "
+                f"The customer will receive a payment prompt on their phone."
+            )
+        }
 
 
 # ============================================================================
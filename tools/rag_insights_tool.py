@@ -16,12 +16,36 @@ Author: Alfred Munga
 License: MIT
 """
 
+import os
+import re
+import hashlib
+import numpy as np
 import pandas as pd
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Import our services
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
@@ -32,6 +56,123 @@ from backend.services.llm_service import LLMService
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Retrieval cache size (distinct category combinations)
+RETRIEVAL_CACHE_SIZE = 256
+
+# Response cache size (distinct normalized queries)
+RESPONSE_CACHE_SIZE = 128
+_TOKEN_RE = re.compile(r'\w+')
+
+
+# Default token budget for the transaction context sent to the LLM
+CONTEXT_TOKEN_BUDGET = 512
+
+# Transaction types counted as money going out
+SPENT_TRANSACTION_TYPES = ('paybill', 'till', 'send', 'withdraw', 'airtime')
+
+# Query keywords that select each spending category
+CATEGORY_KEYWORDS = {
+    'transport': ['transport', 'uber', 'bolt', 'taxi', 'fuel', 'petrol', 'shell', 'total', 'kenol'],
+    'food': ['food', 'restaurant', 'cafe', 'meal', 'kfc', 'java', 'naivas', 'carrefour', 'groceries'],
+    'utilities': ['utility', 'utilities', 'kplc', 'power', 'electricity', 'water', 'internet'],
+    'airtime': ['airtime', 'safaricom', 'airtel', 'telkom'],
+    'withdrawal': ['withdraw', 'withdrawal', 'cash'],
+    'income': ['received', 'income', 'payment', 'deposit'],
+}
+
+# (column, case-insensitive pattern) identifying each category's transactions
+CATEGORY_PATTERNS = {
+    'transport': ('sender_recipient', 'SHELL|TOTAL|KENOL|RUBIS|UBER|BOLT'),
+    'food': ('sender_recipient', 'KFC|JAVA|NAIVAS|CARREFOUR|RESTAURANT'),
+    'utilities': ('sender_recipient', 'KPLC|POWER|WATER|INTERNET'),
+    'airtime': ('transaction_type', 'airtime'),
+    'withdrawal': ('transaction_type', 'withdraw'),
+    'income': ('transaction_type', 'received'),
+}
+
+
+def _build_keyword_matcher() -> Callable[[str], Set[str]]:
+    """
+    Compile CATEGORY_KEYWORDS into a single-pass substring matcher.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, else
+    one regex alternation (longest keyword first, matched at every offset
+    via lookahead so overlapping keywords are all seen).
+    
+    Returns:
+        Function mapping case-folded query text to the set of matched categories
+    """
+    keyword_category = {
+        keyword: category
+        for category, keywords in CATEGORY_KEYWORDS.items()
+        for keyword in keywords
+    }
+    
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword, category in keyword_category.items():
+            automaton.add_word(keyword, category)
+        automaton.make_automaton()
+        return lambda text: {category for _, category in automaton.iter(text)}
+    
+    alternation = '|'.join(
+        re.escape(keyword) for keyword in sorted(keyword_category, key=len, reverse=True)
+    )
+    pattern = re.compile(f'(?=({alternation}))')
+    return lambda text: {keyword_category[m.group(1)] for m in pattern.finditer(text)}
+
+
+_match_categories = _build_keyword_matcher()
+
+
+@lru_cache(maxsize=None)
+def _token_encoding():
+    """
+    Load tiktoken's cl100k_base encoding on first use.
+    
+    tiktoken downloads the encoding the first time it is needed, so this
+    is deferred past import and a failure (e.g. offline) is not fatal.
+    
+    Returns:
+        The encoding, or None if tiktoken is missing or loading failed
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {str(e)}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """
+    Count (or estimate) LLM tokens in text.
+    
+    cl100k_base is only a proxy for Gemini's tokenizer; without it,
+    falls back to roughly four characters per token.
+    """
+    encoding = _token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def _normalize_query(text: str) -> str:
+    """
+    Normalize a query for exact-match response caching.
+    
+    Only case, punctuation and spacing are ignored; word order and every
+    word are kept, so questions that differ in meaning never share a key.
+    
+    Args:
+        text: Query text
+        
+    Returns:
+        Case-folded words joined by single spaces ('' if there are none)
+    """
+    return ' '.join(_TOKEN_RE.findall(text.casefold()))
+
 
 # ============================================================================
 # RAG Insights Tool
@@ -48,7 +189,7 @@ class RAGInsightsTool:
     
     Attributes:
         memory: MemoryBank instance for user context
-        llm_service: LLM service for generating responses
+        llm_service: LLM service for generating responses (created on first use)
         data_path: Path to transaction data (sms.csv)
         transactions_df: Loaded transaction dataframe
     """
@@ -64,11 +205,11 @@ class RAGInsightsTool:
         
         Args:
             memory: MemoryBank with user context
-            llm_service: LLM service instance (creates new if None)
+            llm_service: LLM service instance (created lazily on first query if None)
             data_path: Path to transactions CSV file
         """
         self.memory = memory
-        self.llm_service = llm_service or LLMService()
+        self._llm_service = llm_service
         
         # Set default data path
         if data_path is None:
@@ -77,23 +218,61 @@ class RAGInsightsTool:
         
         self.data_path = Path(data_path)
         self.transactions_df = None
+        self._category_masks: Dict[str, np.ndarray] = {}
+        self._spent_codes = np.array([], dtype=np.int8)
+        self._received_code = -1
+        self._type_totals: Optional[pd.DataFrame] = None
+        
+        # (memory.profile_version, rendered profile/budgets, their fingerprint)
+        self._profile_ctx_cache: Optional[Tuple[int, str, str]] = None
+        
+        # (normalized query, memory fingerprint) -> response, oldest first
+        self._resp_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        
+        # matched categories -> (relevant transaction count, compacted context)
+        self._retrieval_cache: "OrderedDict[Tuple[str, ...], Tuple[int, str]]" = OrderedDict()
         
         # Load transactions
         self._load_transactions()
         
         logger.info(f"RAG Insights Tool initialized with {len(self.transactions_df)} transactions")
     
+    @property
+    def llm_service(self) -> LLMService:
+        """LLM service, constructed on first access so summary-only use needs no API key."""
+        if self._llm_service is None:
+            self._llm_service = LLMService()
+        return self._llm_service
+    
     def _load_transactions(self) -> None:
-        """Load transactions from CSV file."""
+        """Load transactions from CSV file (via an Arrow snapshot when possible)."""
         try:
             if not self.data_path.exists():
                 raise FileNotFoundError(f"Transaction data not found at {self.data_path}")
             
-            self.transactions_df = pd.read_csv(self.data_path)
+            self.transactions_df = self._read_transactions()
+            # Cached contexts and answers were built from the previous data
+            self._retrieval_cache.clear()
+            self._resp_cache.clear()
             
-            # Parse dates
-            if 'date' in self.transactions_df.columns:
-                self.transactions_df['date'] = pd.to_datetime(self.transactions_df['date'])
+            # Rows arrive in ascending date order (see _read_csv); only re-sort
+            # if they don't, since sorting copies a memory-mapped frame
+            if (
+                'date' in self.transactions_df.columns
+                and not self.transactions_df['date'].is_monotonic_increasing
+            ):
+                self.transactions_df = self._sort_by_date(self.transactions_df)
+            
+            self._convert_string_columns()
+            self._build_category_masks()
+            
+            # Per-type amount sum and count in one pass, for get_transaction_summary
+            self._type_totals = (
+                self.transactions_df
+                .groupby('transaction_type', observed=True)['amount']
+                .agg(['sum', 'count'])
+                .sort_values('count', ascending=False, kind='stable')
+            )
             
             logger.info(f"Loaded {len(self.transactions_df)} transactions from {self.data_path}")
         
@@ -101,6 +280,128 @@ class RAGInsightsTool:
             logger.error(f"Error loading transactions: {str(e)}")
             raise
     
+    @staticmethod
+    def _sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+        """Sort rows oldest first, so recency needs no per-query sort."""
+        return df.sort_values('date', kind='stable', na_position='first').reset_index(drop=True)
+    
+    def _read_csv(self) -> pd.DataFrame:
+        """Read the transactions CSV, parse its dates and sort by date."""
+        df = pd.read_csv(self.data_path)
+        
+        # Parse dates
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+            df = self._sort_by_date(df)
+        
+        return df
+    
+    def _read_transactions(self) -> pd.DataFrame:
+        """
+        Read transactions, preferring a memory-mapped Arrow snapshot of the CSV.
+        
+        With pyarrow installed, the CSV is parsed once and written next to
+        it as an uncompressed Arrow IPC file (<name>.arrow). Later loads
+        memory-map that file, so worker processes on the same host share its
+        page-cache pages instead of each holding a parsed copy. The snapshot
+        is written already sorted by date, and is rebuilt whenever the CSV
+        is newer or the snapshot cannot be read. Without pyarrow the CSV is
+        read directly.
+        
+        Returns:
+            Transactions DataFrame with parsed dates
+        """
+        if not PYARROW_AVAILABLE:
+            return self._read_csv()
+        
+        snapshot_path = self.data_path.with_suffix('.arrow')
+        if (
+            snapshot_path.exists()
+            and snapshot_path.stat().st_mtime >= self.data_path.stat().st_mtime
+        ):
+            try:
+                source = pa.memory_map(str(snapshot_path), 'r')
+                table = pa.ipc.open_file(source).read_all()
+                # split_blocks lets null-free numeric columns stay views on the map
+                return table.to_pandas(split_blocks=True)
+            except Exception as e:
+                logger.warning(f"Unreadable Arrow snapshot {snapshot_path}, rebuilding: {str(e)}")
+        
+        df = self._read_csv()
+        tmp_path = snapshot_path.with_name(snapshot_path.name + '.tmp')
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, snapshot_path)
+            logger.info(f"Wrote Arrow snapshot to {snapshot_path}")
+        except Exception as e:
+            logger.warning(f"Could not write Arrow snapshot {snapshot_path}: {str(e)}")
+        return df
+    
+    def _convert_string_columns(self) -> None:
+        """
+        Store the filtered string columns in compact columnar dtypes.
+        
+        transaction_type has a handful of distinct values, so it becomes a
+        categorical whose int codes make type filters plain integer compares.
+        sender_recipient moves to Arrow-backed strings when pyarrow is present.
+        """
+        df = self.transactions_df
+        
+        tx_type = df['transaction_type'].astype('category')
+        df['transaction_type'] = tx_type
+        categories = tx_type.cat.categories
+        self._spent_codes = np.flatnonzero(categories.isin(SPENT_TRANSACTION_TYPES))
+        self._received_code = (
+            categories.get_loc('received') if 'received' in categories else -1
+        )
+        
+        if PYARROW_AVAILABLE:
+            df['sender_recipient'] = df['sender_recipient'].astype('string[pyarrow]')
+    
+    def _type_masks(self, transactions_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Boolean (spent, received) masks for a slice of the loaded transactions.
+        
+        Args:
+            transactions_df: DataFrame sharing the loaded transaction_type categories
+            
+        Returns:
+            Tuple of (spent_mask, received_mask) numpy arrays
+        """
+        codes = transactions_df['transaction_type'].cat.codes.to_numpy()
+        return np.isin(codes, self._spent_codes), codes == self._received_code
+    
+    def _build_category_masks(self) -> None:
+        """
+        Precompute one boolean row mask per category.
+        
+        The data is static after load, so the regex scans run once here
+        instead of on every query.
+        """
+        self._category_masks = {
+            category: self.transactions_df[column].str.contains(
+                pattern, case=False, na=False
+            ).to_numpy(dtype=bool)
+            for category, (column, pattern) in CATEGORY_PATTERNS.items()
+        }
+    
+    def _query_categories(self, user_query: str) -> List[str]:
+        """
+        Find the spending categories a query mentions.
+        
+        Args:
+            user_query: User's natural language query
+            
+        Returns:
+            Matched category names, in CATEGORY_KEYWORDS order
+        """
+        # One pass over the case-folded query
+        found = _match_categories(user_query.casefold())
+        return [c for c in CATEGORY_KEYWORDS if c in found]
+    
     def _retrieve_relevant_transactions(
         self,
         user_query: str,
@@ -119,78 +420,59 @@ class RAGInsightsTool:
         Returns:
             Filtered DataFrame of relevant transactions
         """
-        query_lower = user_query.lower()
-        
-        # Define keyword mappings for categories
-        category_keywords = {
-            'transport': ['transport', 'uber', 'bolt', 'taxi', 'fuel', 'petrol', 'shell', 'total', 'kenol'],
-            'food': ['food', 'restaurant', 'cafe', 'meal', 'kfc', 'java', 'naivas', 'carrefour', 'groceries'],
-            'utilities': ['utility', 'utilities', 'kplc', 'power', 'electricity', 'water', 'internet'],
-            'airtime': ['airtime', 'safaricom', 'airtel', 'telkom'],
-            'withdrawal': ['withdraw', 'withdrawal', 'cash'],
-            'income': ['received', 'income', 'payment', 'deposit'],
-        }
-        
-        # Find matching categories
-        matching_categories = []
-        for category, keywords in category_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                matching_categories.append(category)
+        return self._filter_transactions(self._query_categories(user_query), max_transactions)
+    
+    def _filter_transactions(
+        self,
+        matching_categories: List[str],
+        max_transactions: int = 20
+    ) -> pd.DataFrame:
+        """
+        Select the most recent transactions in the given categories.
         
+        Args:
+            matching_categories: Categories to include (all transactions if empty)
+            max_transactions: Maximum number of transactions to return
+            
+        Returns:
+            Filtered DataFrame of relevant transactions
+        """
         # Filter transactions
         if matching_categories:
             logger.info(f"Filtering for categories: {matching_categories}")
             
-            # Filter by transaction type or sender/recipient
-            mask = pd.Series([False] * len(self.transactions_df))
-            
+            # OR together the precomputed category masks
+            mask = np.zeros(len(self.transactions_df), dtype=bool)
             for category in matching_categories:
-                if category == 'transport':
-                    mask |= self.transactions_df['sender_recipient'].str.contains(
-                        'SHELL|TOTAL|KENOL|RUBIS|UBER|BOLT', case=False, na=False
-                    )
-                elif category == 'food':
-                    mask |= self.transactions_df['sender_recipient'].str.contains(
-                        'KFC|JAVA|NAIVAS|CARREFOUR|RESTAURANT', case=False, na=False
-                    )
-                elif category == 'utilities':
-                    mask |= self.transactions_df['sender_recipient'].str.contains(
-                        'KPLC|POWER|WATER|INTERNET', case=False, na=False
-                    )
-                elif category == 'airtime':
-                    mask |= self.transactions_df['transaction_type'].str.contains(
-                        'airtime', case=False, na=False
-                    )
-                elif category == 'withdrawal':
-                    mask |= self.transactions_df['transaction_type'].str.contains(
-                        'withdraw', case=False, na=False
-                    )
-                elif category == 'income':
-                    mask |= self.transactions_df['transaction_type'].str.contains(
-                        'received', case=False, na=False
-                    )
+                mask |= self._category_masks[category]
             
             filtered_df = self.transactions_df[mask]
         else:
             # No specific category - return recent transactions
             logger.info("No specific category detected, returning recent transactions")
-            filtered_df = self.transactions_df.copy()
+            filtered_df = self.transactions_df
         
-        # Sort by date (most recent first) and limit
+        # Rows are stored oldest first, so the most recent are the tail
         if 'date' in filtered_df.columns:
-            filtered_df = filtered_df.sort_values('date', ascending=False)
+            return filtered_df.tail(max_transactions).iloc[::-1]
         
         return filtered_df.head(max_transactions)
     
-    def _compact_context(self, transactions_df: pd.DataFrame) -> str:
+    def _compact_context(
+        self,
+        transactions_df: pd.DataFrame,
+        max_context_tokens: int = CONTEXT_TOKEN_BUDGET
+    ) -> str:
         """
         Compact transaction data into a concise context string.
         
         This implements the **Context Compaction** step of RAG by
-        summarizing transactions into a readable format.
+        summarizing transactions into a readable format. Detail lines are
+        added (most relevant first) only while they fit the token budget.
         
         Args:
             transactions_df: DataFrame of transactions
+            max_context_tokens: Token budget for the returned context
             
         Returns:
             Formatted context string
@@ -201,13 +483,12 @@ class RAGInsightsTool:
         context_parts = [f"TRANSACTION DATA ({len(transactions_df)} transactions):"]
         
         # Calculate summary statistics
-        total_spent = transactions_df[
-            transactions_df['transaction_type'].isin(['paybill', 'till', 'send', 'withdraw', 'airtime'])
-        ]['amount'].sum()
-        
-        total_received = transactions_df[
-            transactions_df['transaction_type'] == 'received'
-        ]['amount'].sum()
+        spent_mask, received_mask = self._type_masks(transactions_df)
+        amounts = transactions_df['amount'].to_numpy()
+        # Masked reductions: no intermediate amounts[mask] arrays. nansum
+        # skips blank amounts like pandas' sum() (and _type_totals) does
+        total_spent = np.nansum(amounts, where=spent_mask)
+        total_received = np.nansum(amounts, where=received_mask)
         
         context_parts.append(f"\nSummary:")
         context_parts.append(f"- Total Spent: KES {total_spent:,.2f}")
@@ -217,20 +498,56 @@ class RAGInsightsTool:
         # List individual transactions
         context_parts.append(f"\nDetailed Transactions:")
         
-        for idx, row in transactions_df.head(10).iterrows():
-            date_str = row['date'].strftime('%Y-%m-%d') if pd.notna(row.get('date')) else 'N/A'
-            tx_type = row['transaction_type']
-            amount = row['amount']
-            recipient = row.get('sender_recipient', 'Unknown')
+        # Pull the shown columns out whole rather than going through iterrows()
+        head = transactions_df.head(10)
+        dates = head['date'].dt.strftime('%Y-%m-%d').fillna('N/A').to_numpy()
+        types = head['transaction_type'].str.upper().to_numpy()
+        amounts = head['amount'].to_numpy()
+        recipients = head['sender_recipient'].fillna('Unknown').to_numpy()
+        
+        used_tokens = _count_tokens("\n".join(context_parts))
+        shown = 0
+        for date_str, tx_type, amount, recipient in zip(dates, types, amounts, recipients):
+            line = f"- {date_str}: {tx_type} KES {amount:,.2f} - {recipient}"
+            line_tokens = _count_tokens(line)
+            if used_tokens + line_tokens > max_context_tokens:
+                break
+            context_parts.append(line)
+            used_tokens += line_tokens
+            shown += 1
+        
+        if len(transactions_df) > shown:
+            context_parts.append(f"... and {len(transactions_df) - shown} more transactions")
+        
+        return "\n".join(context_parts)
+    
+    def _retrieve_context(self, user_query: str) -> Tuple[int, str]:
+        """
+        Run retrieval and compaction, reusing results for repeat signatures.
+        
+        Retrieval depends only on which categories the query matches, so
+        queries matching the same categories share one cached context.
+        
+        Args:
+            user_query: User's natural language query
             
-            context_parts.append(
-                f"- {date_str}: {tx_type.upper()} KES {amount:,.2f} - {recipient}"
-            )
+        Returns:
+            Tuple of (number of relevant transactions, compacted context)
+        """
+        key = tuple(self._query_categories(user_query))
         
-        if len(transactions_df) > 10:
-            context_parts.append(f"... and {len(transactions_df) - 10} more transactions")
+        cached = self._retrieval_cache.get(key)
+        if cached is not None:
+            self._retrieval_cache.move_to_end(key)
+            return cached
         
-        return "\n".join(context_parts)
+        relevant_txs = self._filter_transactions(list(key))
+        result = (len(relevant_txs), self._compact_context(relevant_txs))
+        
+        self._retrieval_cache[key] = result
+        if len(self._retrieval_cache) > RETRIEVAL_CACHE_SIZE:
+            self._retrieval_cache.popitem(last=False)
+        return result
     
     def _construct_full_context(
         self,
@@ -247,19 +564,97 @@ class RAGInsightsTool:
         Returns:
             Complete context string
         """
-        # Get memory context
-        memory_context = self.memory.get_context(
-            include_profile=True,
-            include_budgets=True,
+        # Get memory context: cached profile/budgets plus fresh history
+        profile_context, _ = self._profile_context()
+        history_context = self.memory.get_context(
+            include_profile=False,
+            include_budgets=False,
             include_history=True,
             num_history=3  # Last 3 conversations for relevance
         )
+        memory_context = "\n\n".join(
+            part for part in (profile_context, history_context) if part
+        )
         
         # Combine contexts
         full_context = f"{memory_context}\n\n{transaction_context}"
         
         return full_context
     
+    def _profile_context(self) -> Tuple[str, str]:
+        """
+        Render the profile and budgets, re-rendering only after they change.
+        
+        Conversation history is left out: it changes on every query and
+        would otherwise invalidate this cache and every cached answer.
+        
+        Returns:
+            Tuple of (rendered profile/budget context, its SHA-1 fingerprint)
+        """
+        version = self.memory.profile_version
+        if self._profile_ctx_cache is None or self._profile_ctx_cache[0] != version:
+            profile_context = self.memory.get_context(include_history=False)
+            fingerprint = hashlib.sha1(profile_context.encode('utf-8')).hexdigest()
+            self._profile_ctx_cache = (version, profile_context, fingerprint)
+        return self._profile_ctx_cache[1], self._profile_ctx_cache[2]
+    
+    def _memory_fingerprint(self) -> str:
+        """Fingerprint the profile and budgets a cached answer depended on."""
+        return self._profile_context()[1]
+    
+    def _lookup_cached_response(
+        self,
+        query_key: str,
+        fingerprint: str
+    ) -> Optional[str]:
+        """
+        Find a cached response for a repeat of the same query.
+        
+        Args:
+            query_key: Normalized incoming query
+            fingerprint: Current memory fingerprint
+            
+        Returns:
+            Cached response text, or None on a miss
+        """
+        key = (query_key, fingerprint)
+        cached = self._resp_cache.get(key)
+        if cached is not None:
+            self._resp_cache.move_to_end(key)
+        return cached
+    
+    def _store_cached_response(
+        self,
+        query_key: str,
+        fingerprint: str,
+        response: str
+    ) -> None:
+        """Add a response to the cache, evicting the least recently used."""
+        if not query_key:
+            return
+        self._resp_cache[(query_key, fingerprint)] = response
+        if len(self._resp_cache) > RESPONSE_CACHE_SIZE:
+            self._resp_cache.popitem(last=False)
+    
+    def _build_context(self, user_query: str) -> Tuple[str, int]:
+        """
+        Build the full LLM context (steps 1-3); only called on a cache miss.
+        
+        Args:
+            user_query: User's natural language question
+            
+        Returns:
+            Tuple of (full context string, number of relevant transactions)
+        """
+        # Steps 1-2: Retrieval and Context Compaction (cached per category set)
+        num_relevant, transaction_context = self._retrieve_context(user_query)
+        logger.info(f"Retrieved {num_relevant} relevant transactions")
+        
+        # Step 3: Prompt Construction - Combine everything
+        full_context = self._construct_full_context(user_query, transaction_context)
+        
+        return full_context, num_relevant
+    
     def run(self, user_query: str) -> str:
         """
         Run the RAG workflow to answer a user query.
@@ -277,35 +672,77 @@ class RAGInsightsTool:
         Returns:
             Natural language answer from the LLM
         """
+        return self.run_structured(user_query)['response']
+    
+    def run_structured(self, user_query: str) -> Dict[str, Any]:
+        """
+        Run the RAG workflow and return the answer with its provenance.
+        
+        The response cache is checked first; retrieval, compaction
+        and prompt construction only run when it misses.
+        
+        Args:
+            user_query: User's natural language question
+            
+        Returns:
+            Dict with:
+            {
+                'success': True/False,
+                'response': str,
+                'cached': bool,
+                'num_transactions': int or None (None when served from cache)
+            }
+        """
         logger.info(f"Processing query: {user_query[:50]}...")
         
         try:
-            # Step 1: Retrieval - Get relevant transactions
-            relevant_txs = self._retrieve_relevant_transactions(user_query)
-            logger.info(f"Retrieved {len(relevant_txs)} relevant transactions")
+            # Answer repeated queries from the response cache
+            query_key = _normalize_query(user_query)
+            fingerprint = self._memory_fingerprint()
+            cached = self._lookup_cached_response(query_key, fingerprint)
+            if cached is not None:
+                logger.info("Response cache hit, skipping LLM call")
+                self.memory.update_history(user_query, cached, "Cached response")
+                return {
+                    'success': True,
+                    'response': cached,
+                    'cached': True,
+                    'num_transactions': None
+                }
             
-            # Step 2: Context Compaction - Summarize transactions
-            transaction_context = self._compact_context(relevant_txs)
-            
-            # Step 3: Prompt Construction - Combine everything
-            full_context = self._construct_full_context(user_query, transaction_context)
+            # Steps 1-3: Retrieval, Context Compaction, Prompt Construction
+            full_context, num_relevant = self._build_context(user_query)
             
             # Step 4: LLM Call - Generate response
             response = self.llm_service.generate_response(user_query, full_context)
+            # LLMService reports API failures as response text; don't cache those
+            if not response.startswith("I encountered an error"):
+                self._store_cached_response(query_key, fingerprint, response)
             
             # Update conversation history
-            context_summary = f"Used {len(relevant_txs)} transactions"
+            context_summary = f"Used {num_relevant} transactions"
             self.memory.update_history(user_query, response, context_summary)
             
             logger.info("Query processed successfully")
             
             # Step 5: Return response
-            return response
+            return {
+                'success': True,
+                'response': response,
+                'cached': False,
+                'num_transactions': num_relevant
+            }
         
         except Exception as e:
             error_msg = f"I encountered an error processing your query: {str(e)}"
             logger.error(f"Error in RAG workflow: {str(e)}")
-            return error_msg
+            return {
+                'success': False,
+                'response': error_msg,
+                'error': str(e),
+                'cached': False,
+                'num_transactions': None
+            }
     
     def get_transaction_summary(self) -> Dict[str, Any]:
         """
@@ -317,19 +754,19 @@ class RAGInsightsTool:
         if self.transactions_df is None or self.transactions_df.empty:
             return {"error": "No transactions loaded"}
         
+        totals = self._type_totals
+        
         summary = {
             "total_transactions": len(self.transactions_df),
             "total_spent": float(
-                self.transactions_df[
-                    self.transactions_df['transaction_type'].isin(['paybill', 'till', 'send', 'withdraw', 'airtime'])
-                ]['amount'].sum()
+                totals.loc[totals.index.isin(SPENT_TRANSACTION_TYPES), 'sum'].sum()
             ),
             "total_received": float(
-                self.transactions_df[
-                    self.transactions_df['transaction_type'] == 'received'
-                ]['amount'].sum()
+                totals.at['received', 'sum'] if 'received' in totals.index else 0.0
             ),
-            "transaction_types": self.transactions_df['transaction_type'].value_counts().to_dict()
+            "transaction_types": {
+                tx_type: int(count) for tx_type, count in totals['count'].items()
+            }
         }
         
         summary['net_flow'] = summary['total_received'] - summary['total_spent']
@@ -367,9 +804,9 @@ if __name__ == "__main__":
         memory = MemoryBank(user_profile=profile, budgets=budgets)
         
         print("\n📝 Initializing RAG Insights Tool...")
-        print("   (Note: Requires GEMINI_API_KEY in .env)")
+        print("   (Note: Queries require GEMINI_API_KEY in .env)")
         
-        # Initialize RAG tool (will fail if no API key)
+        # Initialize RAG tool (the LLM service is created on the first query)
         tool = RAGInsightsTool(memory=memory)
         
         # Get transaction summary
@@ -380,7 +817,7 @@ if __name__ == "__main__":
         print(f"   Total Received: KES {summary['total_received']:,.2f}")
         print(f"   Net Flow: KES {summary['net_flow']:,.2f}")
         
-        # Test query (will fail if no API key)
+        # Test query (returns an error message if no API key)
         print("\n💬 Testing RAG Query...")
         query = "How much have I spent on transport?"
         print(f"   Query: {query}")
@@ -11,10 +11,169 @@ Milestone: 3 - SMS Parser Tool
 """
 
 import re
-from typing import Dict, Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, Optional, List, Tuple, Union
 from datetime import datetime
 from decimal import Decimal
 
+import numpy as np
+
+# Optional: RE2 matches in linear time, so long or hostile SMS cannot make
+# the lazy gaps backtrack; the patterns use no RE2-unsupported syntax
+try:
+    import re2 as _re
+    RE2_AVAILABLE = True
+except ImportError:
+    _re = re
+    RE2_AVAILABLE = False
+
+
+# Kenyan banks recognised in bank notification SMS
+KENYAN_BANKS = (
+    'KCB', 'Equity', 'Co-operative', 'Barclays', 'Standard Chartered',
+    'NCBA', 'I&M', 'DTB', 'Family', 'Stanbic',
+)
+
+# Shared "<Bank name> Bank:" prefix of every bank pattern
+_BANK_PREFIX = r'(?P<bank>(?:' + '|'.join(KENYAN_BANKS) + r')\s+Bank):\s+'
+
+# Filler allowed between the fixed phrases of a pattern. Bounded so that a
+# long message missing a trailing phrase fails fast instead of rescanning
+# the rest of the text from every earlier anchor
+_GAP = r'.{0,300}?'
+
+# Shared "... Acc XXXX1234 Balance: KES ... Ref: ... on DD-Mon-YYYY" tail of
+# the deposit, withdrawal and transfer patterns
+_BANK_SUFFIX = (
+    _GAP +
+    r'Acc\s+(?P<account>XXXX\d+)\s+Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Ref:\s+(?P<reference>\d+)\s+on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4})'
+)
+
+# Transaction patterns, compiled once at import rather than per instance
+
+# M-Pesa Received Pattern
+# Example: "RB90VRG Confirmed. You have received Ksh5,991.87 from STEPHEN WAMBUI 254712531512..."
+_MPESA_RECEIVED_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have received\s+'
+    r'Ksh(?P<amount>[\d,]+\.?\d*)\s+from\s+(?P<sender>[A-Z\s\']+?)\s+'
+    r'(?P<phone>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
+    r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New M-PESA balance is Ksh(?P<balance>-?[\d,]+\.?\d*)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# M-Pesa Sent Pattern
+# Example: "SG45KLM Confirmed. Ksh1,234.56 sent to JOHN DOE 254700123456..."
+_MPESA_SENT_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+Ksh(?P<amount>[\d,]+\.?\d*)\s+'
+    r'sent to\s+(?P<recipient>[A-Z\s]+?)\s+(?P<phone>254\d{9})\s+on\s+'
+    r'(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New M-PESA balance is Ksh(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# M-Pesa Paybill Pattern
+# Example: "RF55KXW Confirmed. You have paid Ksh446.84 to RUBIS ENERGY for account 560697..."
+_MPESA_PAYBILL_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have paid\s+'
+    r'Ksh(?P<amount>[\d,]+\.?\d*)\s+to\s+(?P<merchant>[A-Z\s&\-]+?)\s+'
+    r'for account\s+(?P<account>\d+)\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
+    r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# M-Pesa Till Pattern
+# Example: "TG29IVS Confirmed. Ksh2,735.54 paid to SHELL PETROL STATION Till Number 060835..."
+_MPESA_TILL_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+Ksh(?P<amount>[\d,]+\.?\d*)\s+'
+    r'paid to\s+(?P<merchant>[A-Z\s&\-]+?)\s+Till Number\s+(?P<till>\d+)\s+on\s+'
+    r'(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# M-Pesa Withdrawal Pattern
+# Example: "HJ71DZN Confirmed. You have withdrawn Ksh1,430.21 from M-PESA Agent SARAH MUGO 254712216091..."
+_MPESA_WITHDRAWAL_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have withdrawn\s+'
+    r'Ksh(?P<amount>[\d,]+\.?\d*)\s+from\s+(?:M-PESA\s+)?Agent\s+(?P<agent>[A-Z\s]+?)\s+'
+    r'(?P<agent_number>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
+    r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New\s+(?:M-PESA\s+)?balance is Ksh(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Tr',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# M-Pesa Airtime Pattern
+# Example: "KL21MUM Confirmed. You bought Ksh200.00 airtime for 254756226688..."
+_MPESA_AIRTIME_RE = _re.compile(
+    r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You bought\s+'
+    r'Ksh(?P<amount>[\d,]+\.?\d*)\s+airtime\s+for\s+'
+    r'(?P<phone>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
+    r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM))' + _GAP +
+    r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# Bank Transaction Patterns
+# Supports multiple Kenyan banks: KCB, Equity, Co-operative, etc.
+
+# Bank Deposit Pattern
+# Example: "KCB Bank: Deposit of KES 10,000.00 received. Acc XXXX1234 Balance: KES 45,678.90..."
+_BANK_DEPOSIT_RE = _re.compile(
+    _BANK_PREFIX +
+    r'Deposit of KES\s+(?P<amount>[\d,]+\.?\d*)\s+received' +
+    _BANK_SUFFIX,
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# Bank Withdrawal Pattern
+# Example: "Equity Bank: Withdrawal of KES 5,000.00 successful. Acc XXXX5678 Balance: KES 12,345.67..."
+_BANK_WITHDRAWAL_RE = _re.compile(
+    _BANK_PREFIX +
+    r'Withdrawal of KES\s+(?P<amount>[\d,]+\.?\d*)\s+successful' +
+    _BANK_SUFFIX,
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# Bank Debit Pattern (Alternative withdrawal format)
+# Example: "Co-operative Bank: Acc XXXX5678 debited KES 14,068.71 on 11-Nov-2025. Balance: KES -24,731.09..."
+_BANK_DEBIT_RE = _re.compile(
+    _BANK_PREFIX +
+    r'Acc\s+(?P<account>XXXX\d+)\s+debited\s+KES\s+(?P<amount>[\d,]+\.?\d*)\s+'
+    r'on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4})' + _GAP +
+    r'Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*)' + _GAP +
+    r'Ref:\s+(?P<reference>\d+)',
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# Bank Transfer Pattern
+# Example: "Co-operative Bank: Transfer of KES 2,730.21 to SAMUEL MWANGI successful..."
+_BANK_TRANSFER_RE = _re.compile(
+    _BANK_PREFIX +
+    r'Transfer of KES\s+(?P<amount>[\d,]+\.?\d*)\s+to\s+(?P<recipient>[A-Z\s]+?)\s+successful' +
+    _BANK_SUFFIX,
+    _re.IGNORECASE | _re.DOTALL
+)
+
+# Parsed results kept per parser; re-ingested statements repeat messages
+PARSE_CACHE_SIZE = 8192
+
+# Distinct date strings remembered; a statement spans few days and minutes
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _strptime(value: str, fmt: str) -> datetime:
+    """Memoised datetime.strptime; datetimes are immutable so sharing is safe."""
+    return datetime.strptime(value, fmt)
+
 
 class SMSParserTool:
     """
@@ -53,133 +212,63 @@ class SMSParserTool:
             self.BANK_TRANSFER,
         ]
         
-        # Compile regex patterns for better performance
+        # Bind the shared patterns and build the parser dispatch
         self._compile_patterns()
+        
+        # Memoise by raw text; parse_sms hands out copies of cached dicts
+        self._parse_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_uncached)
     
     def _compile_patterns(self):
-        """Compile all regex patterns for transaction parsing."""
-        
-        # M-Pesa Received Pattern
-        # Example: "RB90VRG Confirmed. You have received Ksh5,991.87 from STEPHEN WAMBUI 254712531512..."
-        self.mpesa_received_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have received\s+'
-            r'Ksh(?P<amount>[\d,]+\.?\d*)\s+from\s+(?P<sender>[A-Z\s\']+?)\s+'
-            r'(?P<phone>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
-            r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New M-PESA balance is Ksh(?P<balance>-?[\d,]+\.?\d*)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # M-Pesa Sent Pattern
-        # Example: "SG45KLM Confirmed. Ksh1,234.56 sent to JOHN DOE 254700123456..."
-        self.mpesa_sent_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+Ksh(?P<amount>[\d,]+\.?\d*)\s+'
-            r'sent to\s+(?P<recipient>[A-Z\s]+?)\s+(?P<phone>254\d{9})\s+on\s+'
-            r'(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New M-PESA balance is Ksh(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # M-Pesa Paybill Pattern
-        # Example: "RF55KXW Confirmed. You have paid Ksh446.84 to RUBIS ENERGY for account 560697..."
-        self.mpesa_paybill_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have paid\s+'
-            r'Ksh(?P<amount>[\d,]+\.?\d*)\s+to\s+(?P<merchant>[A-Z\s&\-]+?)\s+'
-            r'for account\s+(?P<account>\d+)\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
-            r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # M-Pesa Till Pattern
-        # Example: "TG29IVS Confirmed. Ksh2,735.54 paid to SHELL PETROL STATION Till Number 060835..."
-        self.mpesa_till_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+Ksh(?P<amount>[\d,]+\.?\d*)\s+'
-            r'paid to\s+(?P<merchant>[A-Z\s&\-]+?)\s+Till Number\s+(?P<till>\d+)\s+on\s+'
-            r'(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Transaction cost[,\s]+Ksh(?P<cost>[\d,]+\.?\d*)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # M-Pesa Withdrawal Pattern
-        # Example: "HJ71DZN Confirmed. You have withdrawn Ksh1,430.21 from M-PESA Agent SARAH MUGO 254712216091..."
-        self.mpesa_withdrawal_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You have withdrawn\s+'
-            r'Ksh(?P<amount>[\d,]+\.?\d*)\s+from\s+(?:M-PESA\s+)?Agent\s+(?P<agent>[A-Z\s]+?)\s+'
-            r'(?P<agent_number>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
-            r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New\s+(?:M-PESA\s+)?balance is Ksh(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Tr',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # M-Pesa Airtime Pattern
-        # Example: "KL21MUM Confirmed. You bought Ksh200.00 airtime for 254756226688..."
-        self.mpesa_airtime_pattern = re.compile(
-            r'(?P<reference>[A-Z0-9]+)\s+Confirmed\.\s+You bought\s+'
-            r'Ksh(?P<amount>[\d,]+\.?\d*)\s+airtime\s+for\s+'
-            r'(?P<phone>254\d{9})\s+on\s+(?P<date>\d{2}/\d{2}/\d{4})\s+at\s+'
-            r'(?P<time>\d{2}:\d{2}\s+(?:AM|PM)).*?'
-            r'New balance is Ksh(?P<balance>-?[\d,]+\.?\d*)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # Bank Transaction Patterns
-        # Supports multiple Kenyan banks: KCB, Equity, Co-operative, etc.
-        
-        # Bank Deposit Pattern
-        # Example: "KCB Bank: Deposit of KES 10,000.00 received. Acc XXXX1234 Balance: KES 45,678.90..."
-        self.bank_deposit_pattern = re.compile(
-            r'(?P<bank>(?:KCB|Equity|Co-operative|Barclays|Standard Chartered|NCBA|I&M|DTB|Family|Stanbic)\s+Bank):\s+'
-            r'Deposit of KES\s+(?P<amount>[\d,]+\.?\d*)\s+received.*?'
-            r'Acc\s+(?P<account>XXXX\d+)\s+Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Ref:\s+(?P<reference>\d+)\s+on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4})',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # Bank Withdrawal Pattern
-        # Example: "Equity Bank: Withdrawal of KES 5,000.00 successful. Acc XXXX5678 Balance: KES 12,345.67..."
-        self.bank_withdrawal_pattern = re.compile(
-            r'(?P<bank>(?:KCB|Equity|Co-operative|Barclays|Standard Chartered|NCBA|I&M|DTB|Family|Stanbic)\s+Bank):\s+'
-            r'Withdrawal of KES\s+(?P<amount>[\d,]+\.?\d*)\s+successful.*?'
-            r'Acc\s+(?P<account>XXXX\d+)\s+Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Ref:\s+(?P<reference>\d+)\s+on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4})',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # Bank Debit Pattern (Alternative withdrawal format)
-        # Example: "Co-operative Bank: Acc XXXX5678 debited KES 14,068.71 on 11-Nov-2025. Balance: KES -24,731.09..."
-        self.bank_debit_pattern = re.compile(
-            r'(?P<bank>(?:KCB|Equity|Co-operative|Barclays|Standard Chartered|NCBA|I&M|DTB|Family|Stanbic)\s+Bank):\s+'
-            r'Acc\s+(?P<account>XXXX\d+)\s+debited\s+KES\s+(?P<amount>[\d,]+\.?\d*)\s+'
-            r'on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4}).*?'
-            r'Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Ref:\s+(?P<reference>\d+)',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # Bank Transfer Pattern
-        # Example: "Co-operative Bank: Transfer of KES 2,730.21 to SAMUEL MWANGI successful..."
-        self.bank_transfer_pattern = re.compile(
-            r'(?P<bank>(?:KCB|Equity|Co-operative|Barclays|Standard Chartered|NCBA|I&M|DTB|Family|Stanbic)\s+Bank):\s+'
-            r'Transfer of KES\s+(?P<amount>[\d,]+\.?\d*)\s+to\s+(?P<recipient>[A-Z\s]+?)\s+successful.*?'
-            r'Acc\s+(?P<account>XXXX\d+)\s+Balance:\s+KES\s+(?P<balance>-?[\d,]+\.?\d*).*?'
-            r'Ref:\s+(?P<reference>\d+)\s+on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{4})',
-            re.IGNORECASE | re.DOTALL
-        )
+        """Bind the shared compiled patterns and build the parser dispatch."""
+        
+        # Patterns are compiled once at import and shared by every instance
+        self.mpesa_received_pattern = _MPESA_RECEIVED_RE
+        self.mpesa_sent_pattern = _MPESA_SENT_RE
+        self.mpesa_paybill_pattern = _MPESA_PAYBILL_RE
+        self.mpesa_till_pattern = _MPESA_TILL_RE
+        self.mpesa_withdrawal_pattern = _MPESA_WITHDRAWAL_RE
+        self.mpesa_airtime_pattern = _MPESA_AIRTIME_RE
+        self.bank_deposit_pattern = _BANK_DEPOSIT_RE
+        self.bank_withdrawal_pattern = _BANK_WITHDRAWAL_RE
+        self.bank_debit_pattern = _BANK_DEBIT_RE
+        self.bank_transfer_pattern = _BANK_TRANSFER_RE
+        
+        # Parsers in order of likelihood, each gated by a lowercase literal
+        # its pattern cannot match without, so most regexes never run.
+        # Families are gated first on the literal every member requires:
+        # M-Pesa SMS read "<ref> Confirmed." and bank SMS "<name> Bank:"
+        self._gated_parsers = [
+            ('confirmed.', [
+                ('you have received', self._parse_mpesa_received),
+                ('sent to', self._parse_mpesa_sent),
+                ('you have paid', self._parse_mpesa_paybill),
+                ('till number', self._parse_mpesa_till),
+                ('you have withdrawn', self._parse_mpesa_withdrawal),
+                ('you bought', self._parse_mpesa_airtime),
+            ]),
+            ('bank:', [
+                ('transfer of kes', self._parse_bank_transfer),
+                ('deposit of kes', self._parse_bank_deposit),
+                ('withdrawal of kes', self._parse_bank_withdrawal),
+                ('debited', self._parse_bank_debit),  # Alternative bank withdrawal format
+            ]),
+        ]
+        
+        # Every pattern quotes an amount in Ksh (M-Pesa) or KES (banks)
+        self._required_markers = ('ksh', 'kes')
     
-    def parse_sms(self, sms_text: str) -> Optional[Dict]:
+    def parse_sms(self, sms_text: str, keep_raw: bool = False) -> Optional[Dict]:
         """
         Parse an SMS message and extract transaction details.
         
         This is the main entry point for SMS parsing. It tries all patterns
-        and returns the first successful match.
+        and returns the first successful match. Results are cached by SMS
+        text, so repeated messages are parsed once; each call still returns
+        a fresh dictionary.
         
         Args:
             sms_text: The SMS message text to parse
+            keep_raw: Include the cleaned SMS text under 'raw_text'
             
         Returns:
             Dictionary containing parsed transaction data with the following fields:
@@ -202,45 +291,72 @@ class SMSParserTool:
         if not sms_text or not isinstance(sms_text, str):
             return None
         
+        result = self._parse_cached(sms_text)
+        if not result:
+            return None
+        
+        parsed = dict(result)
+        if keep_raw:
+            parsed['raw_text'] = sms_text.strip()
+        return parsed
+    
+    def _parse_uncached(self, sms_text: str) -> Optional[Dict]:
+        """Run the gated parsers over one SMS; backs the parse_sms cache."""
         # Clean the SMS text
         sms_text = sms_text.strip()
         
-        # Try each parser in order of likelihood
-        parsers = [
-            (self.MPESA_RECEIVED, self._parse_mpesa_received),
-            (self.MPESA_SENT, self._parse_mpesa_sent),
-            (self.MPESA_PAYBILL, self._parse_mpesa_paybill),
-            (self.MPESA_TILL, self._parse_mpesa_till),
-            (self.MPESA_WITHDRAWAL, self._parse_mpesa_withdrawal),
-            (self.MPESA_AIRTIME, self._parse_mpesa_airtime),
-            (self.BANK_TRANSFER, self._parse_bank_transfer),
-            (self.BANK_DEPOSIT, self._parse_bank_deposit),
-            (self.BANK_WITHDRAWAL, self._parse_bank_withdrawal),
-            (self.BANK_WITHDRAWAL, self._parse_bank_debit),  # Alternative bank withdrawal format
-        ]
+        # Patterns are case-insensitive, so probe the signatures in lowercase
+        sms_lower = sms_text.lower()
         
-        for transaction_type, parser_func in parsers:
-            try:
-                result = parser_func(sms_text)
-                if result:
-                    return result
-            except Exception as e:
-                # Log error but continue trying other parsers
+        # No currency marker means no pattern can match (spam, OTPs, etc.)
+        if not any(marker in sms_lower for marker in self._required_markers):
+            return None
+        
+        # Try each parser whose signature is present, in order of likelihood
+        for family_marker, parsers in self._gated_parsers:
+            if family_marker not in sms_lower:
                 continue
+            for signature, parser_func in parsers:
+                if signature not in sms_lower:
+                    continue
+                try:
+                    result = parser_func(sms_text)
+                    if result:
+                        return result
+                except Exception as e:
+                    # Log error but continue trying other parsers
+                    continue
         
         # No parser matched
         return None
     
-    def parse_bulk(self, sms_list: List[str]) -> List[Dict]:
+    def parse_bulk(
+        self,
+        sms_list: List[str],
+        workers: int = 1,
+        chunksize: int = 512,
+        compute_stats: bool = False,
+        keep_raw: bool = False
+    ) -> Union[List[Dict], Tuple[List[Dict], Dict]]:
         """
         Parse multiple SMS messages in bulk.
         
+        With workers > 1, batches larger than one chunk are sharded across
+        worker processes; otherwise messages parse inline.
+        
         Args:
             sms_list: List of SMS message texts
+            workers: Worker process count (default: 1, parse inline)
+            chunksize: Messages handed to a worker per task
+            compute_stats: Also accumulate get_statistics() output in the
+                same pass over the results
+            keep_raw: Include each cleaned SMS under 'raw_text'; 'sms_index'
+                already points back into sms_list
             
         Returns:
             List of parsed transaction dictionaries. Failed parses are included
-            with an 'error' field instead of transaction data.
+            with an 'error' field instead of transaction data. With
+            compute_stats, a (results, stats) tuple instead.
             
         Example:
             >>> parser = SMSParserTool()
@@ -248,37 +364,106 @@ class SMSParserTool:
             >>> results = parser.parse_bulk(messages)
             >>> print(f"Parsed {len(results)} messages")
         """
+        if workers > 1 and len(sms_list) > chunksize:
+            # Each worker builds its own parser; compiled patterns and the
+            # parse cache are not shipped across processes
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker_parser,
+                initargs=(type(self),)
+            ) as executor:
+                parsed_list = list(executor.map(
+                    partial(_parse_in_worker, keep_raw=keep_raw),
+                    sms_list,
+                    chunksize=chunksize
+                ))
+        else:
+            parsed_list = map(partial(self.parse_sms, keep_raw=keep_raw), sms_list)
+        
+        stats = self._empty_statistics(len(sms_list)) if compute_stats else None
         results = []
-        for idx, sms_text in enumerate(sms_list):
-            parsed = self.parse_sms(sms_text)
+        append = results.append
+        for idx, (sms_text, parsed) in enumerate(zip(sms_list, parsed_list)):
             if parsed:
                 parsed['sms_index'] = idx
-                results.append(parsed)
             else:
-                results.append({
+                parsed = {
                     'sms_index': idx,
                     'error': 'Failed to parse SMS',
                     'original_text': sms_text[:100]  # First 100 chars
-                })
+                }
+            append(parsed)
+            if stats is not None:
+                self._update_statistics(stats, parsed)
+        
+        if compute_stats:
+            return results, stats
         return results
     
+    def parse_bulk_columnar(self, sms_list: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Parse multiple SMS messages into column arrays for aggregation.
+        
+        Row i of every column describes sms_list[i]. Rows that fail to parse
+        have parsed=False, an empty transaction_type, zero amounts and NaT.
+        
+        Args:
+            sms_list: List of SMS message texts
+            
+        Returns:
+            Dictionary of equal-length NumPy arrays:
+            - parsed: bool, whether the SMS parsed
+            - transaction_type: str (U16)
+            - amount_cents: int64, amount in cents
+            - balance_cents: int64, balance in cents
+            - date: datetime64[s]
+            
+        Example:
+            >>> cols = parser.parse_bulk_columnar(messages)
+            >>> received = cols['transaction_type'] == 'received'
+            >>> print(cols['amount_cents'][received].sum() / 100)
+        """
+        n = len(sms_list)
+        parsed_mask = np.zeros(n, dtype=bool)
+        types = np.full(n, '', dtype='U16')
+        amounts = np.zeros(n, dtype=np.int64)
+        balances = np.zeros(n, dtype=np.int64)
+        dates = np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+        
+        parse = self.parse_sms
+        for idx, sms_text in enumerate(sms_list):
+            parsed = parse(sms_text)
+            if not parsed:
+                continue
+            parsed_mask[idx] = True
+            types[idx] = parsed['transaction_type']
+            amounts[idx] = self._to_cents(parsed['amount'])
+            balances[idx] = self._to_cents(parsed['balance'])
+            dates[idx] = parsed['date']
+        
+        return {
+            'parsed': parsed_mask,
+            'transaction_type': types,
+            'amount_cents': amounts,
+            'balance_cents': balances,
+            'date': dates,
+        }
+    
     def _parse_mpesa_received(self, sms_text: str) -> Optional[Dict]:
         """Parse M-Pesa money received SMS."""
         match = self.mpesa_received_pattern.search(sms_text)
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_RECEIVED,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'sender': data['sender'].strip(),
-            'phone': data['phone'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'sender': match['sender'],
+            'phone': match['phone'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
             'transaction_cost': Decimal('0.00'),  # Typically 0 for receiving
-            'raw_text': sms_text
         }
     
     def _parse_mpesa_sent(self, sms_text: str) -> Optional[Dict]:
@@ -287,17 +472,15 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_SENT,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'recipient': data['recipient'].strip(),
-            'phone': data['phone'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
-            'transaction_cost': self._parse_amount(data['cost']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'recipient': match['recipient'],
+            'phone': match['phone'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
+            'transaction_cost': self._parse_amount(match['cost'])
         }
     
     def _parse_mpesa_paybill(self, sms_text: str) -> Optional[Dict]:
@@ -306,17 +489,15 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_PAYBILL,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'merchant': data['merchant'].strip(),
-            'account_number': data['account'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
-            'transaction_cost': self._parse_amount(data['cost']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'merchant': match['merchant'],
+            'account_number': match['account'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
+            'transaction_cost': self._parse_amount(match['cost'])
         }
     
     def _parse_mpesa_till(self, sms_text: str) -> Optional[Dict]:
@@ -325,17 +506,15 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_TILL,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'merchant': data['merchant'].strip(),
-            'till_number': data['till'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
-            'transaction_cost': self._parse_amount(data['cost']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'merchant': match['merchant'],
+            'till_number': match['till'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
+            'transaction_cost': self._parse_amount(match['cost'])
         }
     
     def _parse_mpesa_withdrawal(self, sms_text: str) -> Optional[Dict]:
@@ -344,17 +523,15 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_WITHDRAWAL,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'agent_name': data['agent'].strip(),
-            'agent_number': data['agent_number'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'agent_name': match['agent'],
+            'agent_number': match['agent_number'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
             'transaction_cost': Decimal('0.00'),  # Extract from text if needed
-            'raw_text': sms_text
         }
     
     def _parse_mpesa_airtime(self, sms_text: str) -> Optional[Dict]:
@@ -363,16 +540,14 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.MPESA_AIRTIME,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'phone': data['phone'],
-            'date': self._parse_mpesa_datetime(data['date'], data['time']),
-            'balance': self._parse_amount(data['balance']),
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'phone': match['phone'],
+            'date': self._parse_mpesa_datetime(match['date'], match['time']),
+            'balance': self._parse_amount(match['balance']),
             'transaction_cost': Decimal('0.00'),  # Included in amount
-            'raw_text': sms_text
         }
     
     def _parse_bank_deposit(self, sms_text: str) -> Optional[Dict]:
@@ -381,16 +556,14 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.BANK_DEPOSIT,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'bank': data['bank'].strip(),
-            'account': data['account'],
-            'date': self._parse_bank_date(data['date']),
-            'balance': self._parse_amount(data['balance']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'bank': match['bank'],
+            'account': match['account'],
+            'date': self._parse_bank_date(match['date']),
+            'balance': self._parse_amount(match['balance'])
         }
     
     def _parse_bank_withdrawal(self, sms_text: str) -> Optional[Dict]:
@@ -399,16 +572,14 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.BANK_WITHDRAWAL,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'bank': data['bank'].strip(),
-            'account': data['account'],
-            'date': self._parse_bank_date(data['date']),
-            'balance': self._parse_amount(data['balance']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'bank': match['bank'],
+            'account': match['account'],
+            'date': self._parse_bank_date(match['date']),
+            'balance': self._parse_amount(match['balance'])
         }
     
     def _parse_bank_transfer(self, sms_text: str) -> Optional[Dict]:
@@ -417,17 +588,15 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.BANK_TRANSFER,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'bank': data['bank'].strip(),
-            'recipient': data['recipient'].strip(),
-            'account': data['account'],
-            'date': self._parse_bank_date(data['date']),
-            'balance': self._parse_amount(data['balance']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'bank': match['bank'],
+            'recipient': match['recipient'],
+            'account': match['account'],
+            'date': self._parse_bank_date(match['date']),
+            'balance': self._parse_amount(match['balance'])
         }
     
     def _parse_bank_debit(self, sms_text: str) -> Optional[Dict]:
@@ -436,16 +605,14 @@ class SMSParserTool:
         if not match:
             return None
         
-        data = match.groupdict()
         return {
             'transaction_type': self.BANK_WITHDRAWAL,
-            'reference': data['reference'],
-            'amount': self._parse_amount(data['amount']),
-            'bank': data['bank'].strip(),
-            'account': data['account'],
-            'date': self._parse_bank_date(data['date']),
-            'balance': self._parse_amount(data['balance']),
-            'raw_text': sms_text
+            'reference': match['reference'],
+            'amount': self._parse_amount(match['amount']),
+            'bank': match['bank'],
+            'account': match['account'],
+            'date': self._parse_bank_date(match['date']),
+            'balance': self._parse_amount(match['balance'])
         }
     
     def _parse_amount(self, amount_str: str) -> Decimal:
@@ -464,6 +631,10 @@ class SMSParserTool:
         clean_amount = amount_str.replace(',', '')
         return Decimal(clean_amount)
     
+    def _to_cents(self, amount: Decimal) -> int:
+        """Convert a parsed Decimal amount to whole cents."""
+        return int((amount * 100).to_integral_value())
+    
     def _parse_mpesa_datetime(self, date_str: str, time_str: str) -> datetime:
         """
         Parse M-Pesa date and time strings to datetime object.
@@ -476,7 +647,7 @@ class SMSParserTool:
             datetime object
         """
         datetime_str = f"{date_str} {time_str}"
-        return datetime.strptime(datetime_str, "%d/%m/%Y %I:%M %p")
+        return _strptime(datetime_str, "%d/%m/%Y %I:%M %p")
     
     def _parse_bank_date(self, date_str: str) -> datetime:
         """
@@ -488,7 +659,7 @@ class SMSParserTool:
         Returns:
             datetime object
         """
-        return datetime.strptime(date_str, "%d-%b-%Y")
+        return _strptime(date_str, "%d-%b-%Y")
     
     def get_transaction_summary(self, parsed_data: Dict) -> str:
         """
@@ -599,40 +770,61 @@ class SMSParserTool:
             >>> stats = parser.get_statistics(parsed_list)
             >>> print(f"Parsed {stats['successful_parses']} out of {stats['total_transactions']}")
         """
-        stats = {
-            'total_transactions': len(parsed_list),
+        stats = self._empty_statistics(len(parsed_list))
+        for parsed in parsed_list:
+            self._update_statistics(stats, parsed)
+        return stats
+    
+    def _empty_statistics(self, total: int) -> Dict:
+        """Return a zeroed statistics dictionary for total messages."""
+        return {
+            'total_transactions': total,
             'successful_parses': 0,
             'failed_parses': 0,
             'total_amount': Decimal('0.00'),
             'transaction_type_counts': {},
             'date_range': {'earliest': None, 'latest': None}
         }
-        
-        for parsed in parsed_list:
-            if 'error' in parsed:
-                stats['failed_parses'] += 1
-                continue
-            
-            stats['successful_parses'] += 1
-            
-            # Sum amounts
-            if 'amount' in parsed:
-                stats['total_amount'] += parsed['amount']
-            
-            # Count transaction types
-            trans_type = parsed.get('transaction_type', 'unknown')
-            stats['transaction_type_counts'][trans_type] = \
-                stats['transaction_type_counts'].get(trans_type, 0) + 1
-            
-            # Track date range
-            if 'date' in parsed:
-                date = parsed['date']
-                if stats['date_range']['earliest'] is None or date < stats['date_range']['earliest']:
-                    stats['date_range']['earliest'] = date
-                if stats['date_range']['latest'] is None or date > stats['date_range']['latest']:
-                    stats['date_range']['latest'] = date
-        
-        return stats
+    
+    def _update_statistics(self, stats: Dict, parsed: Dict) -> None:
+        """Fold one parse_bulk entry into running statistics."""
+        if 'error' in parsed:
+            stats['failed_parses'] += 1
+            return
+        
+        stats['successful_parses'] += 1
+        
+        # Sum amounts
+        if 'amount' in parsed:
+            stats['total_amount'] += parsed['amount']
+        
+        # Count transaction types
+        trans_type = parsed.get('transaction_type', 'unknown')
+        stats['transaction_type_counts'][trans_type] = \
+            stats['transaction_type_counts'].get(trans_type, 0) + 1
+        
+        # Track date range
+        if 'date' in parsed:
+            date = parsed['date']
+            if stats['date_range']['earliest'] is None or date < stats['date_range']['earliest']:
+                stats['date_range']['earliest'] = date
+            if stats['date_range']['latest'] is None or date > stats['date_range']['latest']:
+                stats['date_range']['latest'] = date
+
+
+# Per-process parser for parallel parse_bulk
+_worker_parser: Optional[SMSParserTool] = None
+
+
+def _init_worker_parser(parser_cls: type) -> None:
+    """Build the per-process parser used by parallel parse_bulk."""
+    global _worker_parser
+    _worker_parser = parser_cls()
+
+
+def _parse_in_worker(sms_text: str, keep_raw: bool = False) -> Optional[Dict]:
+    """Parse one SMS with this worker's parser."""
+    return _worker_parser.parse_sms(sms_text, keep_raw=keep_raw)
 
 
 # Example usage and testing
@@ -20,6 +20,7 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
 import re
 import logging
 
@@ -38,6 +39,12 @@ class ServiceProvider(Enum):
     UNKNOWN = "unknown"
 
 
+# Provider indicators, checked case-insensitively without lowercasing the SMS.
+# M-Pesa wins when both appear; "airtel" also covers "airtel money"/"airtelmoney".
+_MPESA_RE = re.compile(r'mpesa|m-pesa|safaricom', re.IGNORECASE)
+_AIRTEL_RE = re.compile(r'airtel', re.IGNORECASE)
+
+
 class TransactionType(Enum):
     """Types of mobile money transactions."""
     RECEIVED = "received"
@@ -175,16 +182,12 @@ class SMSParserTool:
         Returns:
             ServiceProvider enum value
         """
-        sms_lower = sms_text.lower()
-        
         # M-Pesa indicators
-        mpesa_indicators = ["mpesa", "m-pesa", "safaricom"]
-        if any(indicator in sms_lower for indicator in mpesa_indicators):
+        if _MPESA_RE.search(sms_text):
             return ServiceProvider.MPESA
         
         # Airtel Money indicators
-        airtel_indicators = ["airtel money", "airtel", "airtelmoney"]
-        if any(indicator in sms_lower for indicator in airtel_indicators):
+        if _AIRTEL_RE.search(sms_text):
             return ServiceProvider.AIRTEL_MONEY
         
         return ServiceProvider.UNKNOWN
@@ -242,20 +245,33 @@ class SMSParserTool:
         
         return TransactionType.UNKNOWN
     
-    def batch_parse(self, sms_messages: List[str]) -> List[ParsingResult]:
+    def batch_parse(
+        self,
+        sms_messages: List[str],
+        max_workers: int = 1
+    ) -> List[ParsingResult]:
         """
         Parse multiple SMS messages in batch.
         
+        With max_workers > 1, messages are sharded across worker processes
+        in chunks. Parsing is cheap enough that process start-up usually
+        costs more than it saves, so the default parses inline.
+        
         Args:
             sms_messages: List of SMS message texts
+            max_workers: Worker process count (default: 1, parse inline)
             
         Returns:
-            List of ParsingResult objects
+            List of ParsingResult objects, in input order
         """
-        results = []
-        for sms in sms_messages:
-            result = self.parse_sms(sms)
-            results.append(result)
+        if max_workers <= 1 or len(sms_messages) <= max_workers:
+            results = [self.parse_sms(sms) for sms in sms_messages]
+        else:
+            chunksize = max(1, len(sms_messages) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(
+                    executor.map(self.parse_sms, sms_messages, chunksize=chunksize)
+                )
         
         logger.info(f"Batch parsed {len(sms_messages)} messages")
         return results